@@ -0,0 +1,143 @@
+from datetime import date
+import numpy as np
+
+from sorted_index import parse_temp
+
+
+# WEATHER-MOOD ANALYTICS
+# ------------------------------------------------------------------
+# Entry metadata is kept in NumPy columns (day, month, weather, city, temp,
+# word count). Strings such as "22°C" are parsed once, when a row is written,
+# and categorical fields are stored as small integer codes. Every
+# aggregation is then a bincount or vector op over the columns rather than
+# a scan over entry dicts.
+
+class JournalAnalytics:
+    def __init__(self, capacity=1024):
+        self.rows = {}
+        self.n = 0
+        self.weather_codes, self.weather_names = {}, []
+        self.city_codes, self.city_names = {}, []
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        old = getattr(self, "day", None)
+        cols = {
+            "day": np.full(capacity, -1, np.int32),
+            "month": np.full(capacity, -1, np.int32),
+            "weather": np.zeros(capacity, np.int32),
+            "city": np.zeros(capacity, np.int32),
+            "temp": np.full(capacity, np.nan, np.float32),
+            "words": np.zeros(capacity, np.int32),
+            "valid": np.zeros(capacity, bool),
+        }
+        for name, col in cols.items():
+            if old is not None: col[:self.n] = getattr(self, name)[:self.n]
+            setattr(self, name, col)
+
+    def _code(self, value, codes, names):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names); names.append(value)
+        return code
+
+    # UPDATES
+    # ------------------------------------------------------------------
+    def add(self, meta):
+        """Adds or overwrites the row for one entry's metadata"""
+        row = self.rows.get(meta["id"])
+        if row is None:
+            if self.n == len(self.day): self._alloc(len(self.day) * 2)
+            row = self.rows[meta["id"]] = self.n
+            self.n += 1
+
+        try:
+            d = date.fromisoformat(meta.get("date", "")[:10])
+            self.day[row], self.month[row] = d.toordinal(), d.year * 12 + d.month - 1
+        except ValueError:
+            self.day[row] = self.month[row] = -1
+        self.weather[row] = self._code(meta.get("weather") or "Clear", self.weather_codes, self.weather_names)
+        self.city[row] = self._code(meta.get("city") or "Unknown", self.city_codes, self.city_names)
+        t = parse_temp(meta.get("temp"))
+        self.temp[row] = np.nan if t is None else t
+        self.words[row] = meta.get("words", 0)
+        self.valid[row] = True
+
+    def add_many(self, metas):
+        for meta in metas: self.add(meta)
+
+    def set_words(self, entry_id, words):
+        row = self.rows.get(entry_id)
+        if row is not None: self.words[row] = words
+
+    def remove(self, entry_id):
+        row = self.rows.pop(entry_id, None)
+        if row is not None: self.valid[row] = False
+
+    # AGGREGATIONS
+    # ------------------------------------------------------------------
+    def _group(self, codes, names):
+        valid = self.valid[:self.n]
+        c, w = codes[:self.n][valid], self.words[:self.n][valid]
+        entries = np.bincount(c, minlength=len(names))
+        words = np.bincount(c, weights=w, minlength=len(names))
+        order = np.argsort(-entries, kind="stable")
+        return [(names[i], int(entries[i]), int(words[i])) for i in order if entries[i]]
+
+    def by_weather(self):
+        """[(condition, entries, words)], most entries first"""
+        return self._group(self.weather, self.weather_names)
+
+    def by_city(self):
+        return self._group(self.city, self.city_names)
+
+    def by_month(self):
+        """[("YYYY-MM", entries, words)] in calendar order"""
+        mask = self.valid[:self.n] & (self.month[:self.n] >= 0)
+        months, w = self.month[:self.n][mask], self.words[:self.n][mask]
+        if not len(months): return []
+        keys, inverse = np.unique(months, return_inverse=True)
+        entries = np.bincount(inverse)
+        words = np.bincount(inverse, weights=w)
+        return [(f"{k // 12}-{k % 12 + 1:02d}", int(e), int(wd)) for k, e, wd in zip(keys, entries, words)]
+
+    def temp_vs_length(self, bin_size=5):
+        """Pearson r between temperature and word count, plus mean words per temperature band"""
+        mask = self.valid[:self.n] & ~np.isnan(self.temp[:self.n])
+        t, w = self.temp[:self.n][mask], self.words[:self.n][mask].astype(np.float64)
+        r = float(np.corrcoef(t, w)[0, 1]) if len(t) > 1 and t.std() > 0 and w.std() > 0 else None
+
+        bands = []
+        if len(t):
+            bins = np.floor(t / bin_size).astype(np.int64)
+            keys, inverse = np.unique(bins, return_inverse=True)
+            counts = np.bincount(inverse)
+            means = np.bincount(inverse, weights=w) / counts
+            bands = [(int(k * bin_size), int(k * bin_size + bin_size), int(c), float(m)) for k, c, m in zip(keys, counts, means)]
+        return {"r": r, "samples": int(len(t)), "bands": bands}
+
+    def streaks(self, today=None):
+        """Longest and current run of consecutive days with at least one entry"""
+        days = np.unique(self.day[:self.n][self.valid[:self.n] & (self.day[:self.n] >= 0)])
+        if not len(days): return {"longest": 0, "current": 0, "days_written": 0}
+
+        breaks = np.flatnonzero(np.diff(days) != 1)
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(days) - 1]))
+        lengths = ends - starts + 1
+
+        today = (today or date.today()).toordinal()
+        # A streak is still current if the last entry was today or yesterday
+        current = int(lengths[-1]) if today - days[-1] <= 1 else 0
+        return {"longest": int(lengths.max()), "current": current, "days_written": int(len(days))}
+
+    def summary(self):
+        return {
+            "entries": int(self.valid[:self.n].sum()),
+            "words": int(self.words[:self.n][self.valid[:self.n]].sum()),
+            "by_weather": self.by_weather(),
+            "by_city": self.by_city(),
+            "by_month": self.by_month(),
+            "temp_vs_length": self.temp_vs_length(),
+            "streaks": self.streaks(),
+        }
@@ -0,0 +1,197 @@
+"""Benchmarks the journal data path and canvas rendering on synthetic archives.
+
+    python benchmarks/bench_journal.py --sizes 1000,10000,100000 --output bench.json
+
+The data path (load, save, search) runs headless. The Tk part (display_entries,
+draw_header_gradient, and cold start of main.py to first paint) needs a display: it uses $DISPLAY, starts Xvfb if one is
+installed, or is skipped with --no-ui.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from journal_store import JournalStore
+from journal_model import JournalModel
+
+WEATHER = ["Clear", "Clouds", "Rain", "Drizzle", "Thunderstorm", "Snow", "Mist", "Fog"]
+CITIES = ["London", "Paris", "Tokyo", "Kathmandu", "New York", "Sydney", "Berlin", "Toronto"]
+CONTENT_WORDS = [20, 80, 300, 1500]  # short notes through long transcripts
+
+
+# SYNTHETIC JOURNALS
+# ------------------------------------------------------------------
+def make_vocab(rng, size=5000):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def make_entry(rng, vocab, i):
+    words = rng.choice(CONTENT_WORDS)
+    return {
+        "title": " ".join(rng.choices(vocab, k=rng.randint(2, 6))).title(),
+        "date": f"20{rng.randint(18, 26)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:{i % 60:02d}",
+        "content": " ".join(rng.choices(vocab, k=words)),
+        "city": rng.choice(CITIES),
+        "weather": rng.choice(WEATHER),
+        "temp": f"{rng.randint(-15, 38)}°C",
+    }
+
+
+def make_journal(directory, n, rng, vocab):
+    store = JournalStore(os.path.join(directory, "context_journal_final.log"), legacy_path=None)
+    store.load()
+    for i in range(n): store.put(make_entry(rng, vocab, i))
+    store.close()
+
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t, result
+
+
+def summary_ms(samples):
+    samples = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+# DATA PATH
+# ------------------------------------------------------------------
+def bench_data(directory, rng, vocab, saves, queries):
+    model = JournalModel(JournalStore(os.path.join(directory, "context_journal_final.log"), legacy_path=None))
+    load_s, _ = timed(model.load)
+    def index_all():
+        while model.index_bodies(): time.sleep(0.01)  # the worker does the indexing
+    index_s, _ = timed(index_all)
+
+    search_samples = []
+    for q in queries:
+        for mode in ("Date (Newest)", "Best Match"):
+            search_samples.append(timed(lambda: len(model.query(q, mode)))[0])
+
+    save_samples = [timed(model.save, make_entry(rng, vocab, i))[0] for i in range(saves)]
+    model.close()
+    return {
+        "load_s": round(load_s, 4),
+        "index_bodies_s": round(index_s, 4),
+        "search": summary_ms(search_samples),
+        "save": summary_ms(save_samples),
+    }
+
+
+# TK RENDERING
+# ------------------------------------------------------------------
+def ensure_display():
+    """Returns (ok, reason, xvfb_process)"""
+    if os.environ.get("DISPLAY"): return True, None, None
+    if not shutil.which("Xvfb"): return False, "no $DISPLAY and Xvfb is not installed", None
+    proc = subprocess.Popen(["Xvfb", ":99", "-screen", "0", "1920x1080x24"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = ":99"
+    time.sleep(1)
+    return True, None, proc
+
+
+def bench_ui(directory, repeats):
+    import ttkbootstrap as tb
+    from main import AtmosphericJournal
+
+    cwd = os.getcwd()
+    os.chdir(directory)  # the app uses its default file names
+    try:
+        root = tb.Window(themename="cosmo")
+        app = AtmosphericJournal(root)
+        while app.history_list is None: root.update()  # Library is built after the first paint
+
+        def display():
+            app.display_entries()
+            root.update_idletasks()
+
+        def gradient_cold():
+            app.render_cache._images.clear()
+            app.draw_header_gradient(None)
+            root.update_idletasks()
+
+        def gradient_warm():
+            app.draw_header_gradient(None)
+            root.update_idletasks()
+
+        results = {
+            "display_entries": summary_ms([timed(display)[0] for _ in range(repeats)]),
+            "draw_header_gradient_cold": summary_ms([timed(gradient_cold)[0] for _ in range(repeats)]),
+            "draw_header_gradient_warm": summary_ms([timed(gradient_warm)[0] for _ in range(repeats)]),
+        }
+        app.on_close()
+        results.update(bench_cold_start(directory, max(repeats // 4, 3)))
+        return results
+    finally:
+        os.chdir(cwd)
+
+
+def bench_cold_start(directory, repeats):
+    """Fresh interpreter per sample: main.py --startup-report prints its timings once the Library is filled"""
+    samples = []
+    for _ in range(repeats):
+        proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py"), "--startup-report"], cwd=directory, stdout=subprocess.PIPE, text=True)
+        try: samples.append(json.loads(proc.stdout.readline()))
+        finally: proc.terminate(); proc.wait()
+    return {
+        "cold_start_first_paint": summary_ms([s["first_paint_ms"] / 1000 for s in samples]),
+        "cold_start_library": summary_ms([s["library_ms"] / 1000 for s in samples]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated entry counts")
+    parser.add_argument("--saves", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20, help="samples per UI measurement")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-ui", action="store_true", help="skip the Tk measurements")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = make_vocab(rng)
+    queries = [vocab[0][:3], vocab[1], f"{vocab[2]} {vocab[3][:4]}", "weather:rain " + vocab[4][:3], "zzzz"]
+
+    report = {"python": platform.python_version(), "platform": platform.platform(), "seed": args.seed, "results": []}
+    ui_ok, ui_reason, xvfb = (False, "--no-ui", None) if args.no_ui else ensure_display()
+    if not ui_ok: report["ui_skipped"] = ui_reason
+
+    try:
+        for n in [int(s) for s in args.sizes.split(",") if s]:
+            with tempfile.TemporaryDirectory(prefix=f"journal-bench-{n}-") as d:
+                gen_s, _ = timed(make_journal, d, n, rng, vocab)
+                row = {"entries": n, "log_mb": round(os.path.getsize(os.path.join(d, "context_journal_final.log")) / 1e6, 2),
+                       "generate_s": round(gen_s, 2)}
+                row.update(bench_data(d, rng, vocab, args.saves, queries))
+                if ui_ok: row["ui"] = bench_ui(d, args.repeats)
+                report["results"].append(row)
+                print(f"{n} entries done", file=sys.stderr)
+    finally:
+        if xvfb: xvfb.terminate()
+
+    out = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f: f.write(out + "\n")
+    else:
+        print(out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+
+# CRASH-SAFE DRAFTS
+# ------------------------------------------------------------------
+# The editor's edits arrive from TextStats as small deltas, for example
+#   {"t": "ins", "at": "3.4", "s": "abc"}      {"t": "del", "a": "3.4", "b": "3.6"}
+# Consecutive keystrokes are merged while they wait in memory, and a
+# background thread appends whatever changed about once a second. Every few
+# thousand deltas the full text is checkpointed and the file starts over,
+# so restoring means replaying one checkpoint plus a short tail.
+
+CHECKPOINT_EVERY = 2000
+
+
+def advance(index, text):
+    """Tk index just after `text` is inserted at `index`"""
+    line, col = map(int, index.split("."))
+    newlines = text.count("\n")
+    if not newlines: return f"{line}.{col + len(text)}"
+    tail = len(text) - text.rfind("\n") - 1
+    return f"{line + newlines}.{tail}"
+
+
+class DraftJournal:
+    def __init__(self, path="draft_journal.log", flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+        self.dirty = False
+        self.suspended = False
+        self.since_checkpoint = 0
+        self.title = None  # last title seen, None while it is the new-entry default
+        self.on_checkpoint_due = None
+        self.writer = threading.Thread(target=self.write_loop, name="draft-writer", daemon=True)
+        self.writer.start()
+
+    # CAPTURE (Tk thread)
+    # ------------------------------------------------------------------
+    def on_edit(self, op, *args):
+        if self.suspended: return
+        self.dirty = True
+        if op == "insert": self.push({"t": "ins", "at": args[0], "s": args[1]})
+        elif op == "delete": self.push({"t": "del", "a": args[0], "b": args[1]})
+        elif op == "reset": self.checkpoint(self.title, args[0])
+
+    def on_title(self, title):
+        if self.suspended: return
+        self.dirty = True
+        self.title = title
+        with self.lock:
+            if self.pending and self.pending[-1]["t"] == "title": self.pending[-1]["v"] = title
+            else: self.pending.append({"t": "title", "v": title})
+        self.wake.set()
+
+    def push(self, rec):
+        with self.lock:
+            last = self.pending[-1] if self.pending else None
+            # Typing: this insert starts where the previous one ended
+            if last and rec["t"] == "ins" and last["t"] == "ins" and advance(last["at"], last["s"]) == rec["at"]:
+                last["s"] += rec["s"]
+            # Backspacing: this delete ends where the previous one started
+            elif last and rec["t"] == "del" and last["t"] == "del" and rec["b"] == last["a"]:
+                last["a"] = rec["a"]
+            else:
+                self.pending.append(rec)
+                self.since_checkpoint += 1
+        self.wake.set()
+        if self.since_checkpoint >= CHECKPOINT_EVERY and self.on_checkpoint_due:
+            self.since_checkpoint = 0
+            self.on_checkpoint_due()
+
+    def checkpoint(self, title, text, clean=False):
+        """Full snapshot; everything queued before it is superseded"""
+        rec = {"t": "ckpt", "title": title, "text": text}
+        self.title = title
+        if clean: rec["clean"] = True
+        with self.lock:
+            self.pending = [rec]
+            self.since_checkpoint = 0
+        self.wake.set()
+
+    def reset(self, title="", text=""):
+        """Editor now holds saved or freshly opened content: nothing to recover"""
+        self.dirty = False
+        self.title = title or None
+        if not title and not text:
+            with self.lock: self.pending = [{"t": "clear"}]
+            self.wake.set()
+        else:
+            self.checkpoint(title, text, clean=True)
+
+    @contextmanager
+    def paused(self):
+        self.suspended = True
+        try: yield
+        finally: self.suspended = False
+
+    # WRITER (background thread)
+    # ------------------------------------------------------------------
+    def write_loop(self):
+        while not self.stop.is_set():
+            self.wake.wait()
+            self.wake.clear()
+            # Let a burst of typing accumulate into one write
+            self.stop.wait(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                batch, self.pending = self.pending, []
+            if batch: self.write(batch)
+
+    def write(self, batch):
+        restart = max((i for i, r in enumerate(batch) if r["t"] in ("ckpt", "clear")), default=None)
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch[restart or 0:] if r["t"] != "clear")
+        if restart is not None:
+            # Checkpoint or clear: the file starts over
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(lines); f.flush(); os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        else:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines); f.flush(); os.fsync(f.fileno())
+
+    def close(self):
+        self.stop.set(); self.wake.set()
+        self.writer.join()
+        self.flush()
+
+    # RESTORE
+    # ------------------------------------------------------------------
+    def restore(self, text_widget, title_var):
+        """Replays the last unsaved draft into the editor. Returns True if there was one"""
+        if not os.path.exists(self.path): return False
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"): break  # torn last record
+                try: records.append(json.loads(line))
+                except ValueError: break
+        if not records: return False
+
+        with self.paused():
+            for r in records:
+                if r["t"] == "ckpt":
+                    text_widget.delete("1.0", "end"); text_widget.insert("1.0", r["text"])
+                    if r.get("title") is not None: title_var.set(r["title"]); self.title = r["title"]
+                elif r["t"] == "ins": text_widget.insert(r["at"], r["s"])
+                elif r["t"] == "del": text_widget.delete(r["a"], r["b"])
+                elif r["t"] == "title": title_var.set(r["v"]); self.title = r["v"]
+        # A lone clean checkpoint is an opened entry nobody has edited yet
+        self.dirty = not (len(records) == 1 and records[0].get("clean"))
+        return True
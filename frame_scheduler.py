@@ -0,0 +1,92 @@
+import time
+
+
+# FRAME SCHEDULER
+# ------------------------------------------------------------------
+# Components mark canvases dirty and register animations here instead of
+# running their own `after` chains. Everything that is due is run in one
+# pass per frame, so several invalidations in the same tick cost one redraw.
+# With nothing dirty and no animation due, no timer is pending at all.
+# Animations are paused while the window is minimised or hidden and slowed
+# down while it does not have focus.
+
+class FrameScheduler:
+    def __init__(self, root, frame_ms=16, unfocused_slowdown=4):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.unfocused_slowdown = unfocused_slowdown
+        self.dirty = {}
+        self.animations = {}  # name -> [step, due time]
+        self.job = None
+        self.job_due = None
+        self.state_job = None
+        self.visible = True
+        self.focused = True
+
+        for seq in ("<Map>", "<Unmap>", "<FocusIn>", "<FocusOut>"):
+            self.root.bind(seq, self.on_window_event, add="+")
+
+    # REGISTRATION
+    # ------------------------------------------------------------------
+    def invalidate(self, key, draw):
+        """Queues draw() for the next frame; repeated invalidations of key collapse into one"""
+        self.dirty[key] = draw
+        self.request(self.frame_ms)
+
+    def animate(self, name, step, delay_ms=0):
+        """step() runs in the frame pass and returns ms until its next run, or None to stop"""
+        self.animations[name] = [step, time.monotonic() + delay_ms / 1000]
+        self.request(delay_ms)
+
+    def stop(self, name):
+        self.animations.pop(name, None)
+
+    # FRAME LOOP
+    # ------------------------------------------------------------------
+    def request(self, delay_ms):
+        if not self.visible: return  # resumed from <Map>
+        due = time.monotonic() + delay_ms / 1000
+        if self.job and self.job_due <= due: return
+        if self.job: self.root.after_cancel(self.job)
+        self.job, self.job_due = self.root.after(max(int(delay_ms), 1), self.run_frame), due
+
+    def run_frame(self):
+        self.job = self.job_due = None
+        if not self.visible: return
+
+        dirty, self.dirty = self.dirty, {}
+        for draw in dirty.values(): draw()
+
+        now = time.monotonic()
+        slowdown = 1 if self.focused else self.unfocused_slowdown
+        for name, anim in list(self.animations.items()):
+            if anim[1] > now: continue
+            delay = anim[0]()
+            if delay is None: self.animations.pop(name, None)
+            else: anim[1] = now + delay * slowdown / 1000
+
+        if self.dirty:
+            self.request(self.frame_ms)
+        elif self.animations:
+            next_due = min(a[1] for a in self.animations.values())
+            self.request(max((next_due - time.monotonic()) * 1000, 0))
+
+    # WINDOW STATE
+    # ------------------------------------------------------------------
+    def on_window_event(self, event):
+        # Child widgets share the toplevel's bindtags, so settle the state once per burst
+        if not self.state_job: self.state_job = self.root.after_idle(self.update_state)
+
+    def update_state(self):
+        self.state_job = None
+        was_visible = self.visible
+        self.visible = self.root.winfo_viewable() and self.root.state() not in ("iconic", "withdrawn")
+        try: self.focused = self.root.focus_displayof() is not None
+        except KeyError: self.focused = True  # focus is in a popup tkinter does not track
+
+        if self.visible and not was_visible:
+            # Catch up: anything that went dirty or came due while hidden runs now
+            self.request(0)
+        elif not self.visible and self.job:
+            self.root.after_cancel(self.job)
+            self.job = self.job_due = None
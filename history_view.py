@@ -0,0 +1,78 @@
+import math
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+
+
+# VIRTUALIZED LIBRARY LIST
+# ------------------------------------------------------------------
+# Only enough cards to cover the visible part of the canvas are ever built.
+# Scrolling rebinds those cards to whichever entries are now in view, and the
+# scrollregion comes from the entry count, so the widget count stays fixed no
+# matter how large the archive is.
+
+class VirtualHistoryList:
+    ROW_HEIGHT = 100
+    ROW_GAP = 8
+
+    def __init__(self, canvas, scrollbar, on_open):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.on_open = on_open
+        self.data = []
+        self.cards = []
+        self.first_row = None
+
+        self.canvas.configure(yscrollcommand=self.on_scroll, yscrollincrement=1)
+        self.scrollbar.configure(command=self.canvas.yview)
+        self.canvas.bind("<Configure>", self.on_resize)
+
+    def set_data(self, data):
+        self.data = data
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), len(data) * self.ROW_HEIGHT))
+        self.canvas.yview_moveto(0)
+        self.refresh(force=True)
+
+    # POOL MANAGEMENT
+    # ------------------------------------------------------------------
+    def make_card(self):
+        card = tb.Frame(self.canvas, bootstyle=SECONDARY, padding=1)
+        inner = tb.Frame(card, bootstyle=LIGHT, padding=15); inner.pack(fill=BOTH, expand=YES)
+        card.title_label = tb.Label(inner, font=("Segoe UI", 12, "bold")); card.title_label.pack(anchor=W)
+        card.badge_label = tb.Label(inner, font=("Segoe UI", 9), foreground="#65676b"); card.badge_label.pack(anchor=W)
+        tb.Button(inner, text="Open", bootstyle="link", command=lambda c=card: self.on_open(c.entry)).pack(side=LEFT)
+        card.entry = None
+        card.window_id = self.canvas.create_window(10, 0, window=card, anchor="nw", state="hidden")
+        return card
+
+    def on_resize(self, event):
+        needed = math.ceil(event.height / self.ROW_HEIGHT) + 1
+        while len(self.cards) < needed: self.cards.append(self.make_card())
+        for card in self.cards:
+            self.canvas.itemconfigure(card.window_id, width=max(event.width - 20, 50), height=self.ROW_HEIGHT - self.ROW_GAP)
+        self.canvas.configure(scrollregion=(0, 0, event.width, len(self.data) * self.ROW_HEIGHT))
+        self.refresh(force=True)
+
+    # VIEWPORT BINDING
+    # ------------------------------------------------------------------
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def refresh(self, force=False):
+        first_row = max(int(self.canvas.canvasy(0) // self.ROW_HEIGHT), 0)
+        if first_row == self.first_row and not force: return
+        self.first_row = first_row
+
+        for slot, card in enumerate(self.cards):
+            row = first_row + slot
+            if row >= len(self.data):
+                card.entry = None
+                self.canvas.itemconfigure(card.window_id, state="hidden")
+                continue
+            e = self.data[row]
+            if force or card.entry is not e:
+                card.entry = e
+                card.title_label.config(text=e['title'])
+                card.badge_label.config(text=f"{e.get('date', '')[:10]} | {e.get('weather', 'Clear')}")
+            self.canvas.coords(card.window_id, 10, row * self.ROW_HEIGHT)
+            self.canvas.itemconfigure(card.window_id, state="normal")
@@ -0,0 +1,57 @@
+"""Headless import/export for the Atmospheric Journal archive.
+
+    python journal_cli.py import ~/notes old_journal.json
+    python journal_cli.py export backup.jsonl
+    python journal_cli.py export notes_dir --format markdown
+"""
+import argparse
+import sys
+import time
+
+from journal_store import JournalStore
+from journal_io import iter_import_batches, export_entries
+
+
+def run_import(store, args):
+    count, started = 0, time.perf_counter()
+    for batch in iter_import_batches(args.paths, batch_size=args.batch, workers=args.workers):
+        store.put_many(batch)
+        count += len(batch)
+        print(f"\rImported {count} entries", end="", file=sys.stderr, flush=True)
+    print(f"\rImported {count} entries in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def run_export(store, args):
+    def progress(entries):
+        for i, e in enumerate(entries, 1):
+            if i % 1000 == 0: print(f"\rExported {i} entries", end="", file=sys.stderr, flush=True)
+            yield e
+    count = export_entries(progress(store.iter_entries()), args.dest, args.format)
+    print(f"\rExported {count} entries to {args.dest}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--journal", default="context_journal_final.log", help="journal log to read/write")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="import Markdown/text notes and JSON journal dumps")
+    imp.add_argument("paths", nargs="+", help="files or directories")
+    imp.add_argument("--batch", type=int, default=500, help="entries per write")
+    imp.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count, max 8)")
+
+    exp = sub.add_parser("export", help="export the archive")
+    exp.add_argument("dest", help="output file, or directory for --format markdown")
+    exp.add_argument("--format", choices=["jsonl", "json", "markdown"], default="jsonl")
+
+    args = parser.parse_args(argv)
+    store = JournalStore(args.journal)
+    store.load()
+    try:
+        (run_import if args.command == "import" else run_export)(store, args)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+# STREAMING IMPORT / EXPORT
+# ------------------------------------------------------------------
+# Everything is converted to the entry schema save_entry produces:
+#   {"title", "date", "content", "city", "weather", "temp"}
+# Imports are generators of small batches. Note files are parsed in a process
+# pool with a bounded number of batches in flight, and JSON dumps are decoded
+# one record at a time, even inside a wrapper object like {"entries": [...]},
+# so memory stays flat however big the input is. Exports stream entries one
+# at a time from the store.
+
+NOTE_EXTS = (".md", ".markdown", ".txt")
+DUMP_EXTS = (".json", ".jsonl")
+READ_CHUNK = 1 << 16
+WHITESPACE = " \t\r\n"
+TOO_BIG = object()
+
+FIELD_ALIASES = {
+    "title": ("title", "name", "subject", "heading"),
+    "content": ("content", "body", "text", "note", "entry"),
+    "date": ("date", "created", "created_at", "timestamp", "time"),
+    "city": ("city", "location", "place"),
+    "weather": ("weather", "condition", "conditions"),
+    "temp": ("temp", "temperature"),
+}
+# Tried in order on dates that aren't ISO 8601; each also with a time of day
+DATE_FORMATS = ("%Y/%m/%d", "%m/%d/%Y", "%d.%m.%Y", "%B %d, %Y", "%b %d, %Y", "%d %B %Y", "%d %b %Y")
+TIME_FORMATS = ("", " %H:%M", " %H:%M:%S", " %I:%M %p")
+MS_EPOCH = 1e11  # as seconds that is the year 5138: larger numbers are milliseconds
+
+
+def parse_date(value):
+    """Local ISO 8601 date of an epoch number or a date string, or None if it isn't one"""
+    # A run of digits is an epoch timestamp, but not a short one like a bare year
+    if isinstance(value, str) and value.strip().isdigit() and len(value.strip()) >= 9: value = int(value)
+    if isinstance(value, bool): return None
+    if isinstance(value, (int, float)):
+        try: return datetime.fromtimestamp(value / 1000 if abs(value) > MS_EPOCH else value).isoformat()
+        except (OverflowError, OSError, ValueError): return None
+    if not isinstance(value, str): return None
+    text = value.strip()
+    try:
+        date = datetime.fromisoformat(text[:-1] + "+00:00" if text[-1:] in "Zz" else text)
+    except ValueError:
+        for fmt in (d + t for d in DATE_FORMATS for t in TIME_FORMATS):
+            try: date = datetime.strptime(text, fmt); break
+            except ValueError: pass
+        else:
+            return None
+    if date.tzinfo: date = date.astimezone().replace(tzinfo=None)
+    return date.isoformat()
+
+
+def normalize(obj, fallback_title="Imported Entry", fallback_date=None):
+    """Maps a foreign journal record onto the entry schema. Dates that can't be read fall back
+    to fallback_date (an ISO string, e.g. the file's mtime), or now"""
+    pick = lambda field, default: next((obj[k] for k in FIELD_ALIASES[field] if obj.get(k) not in (None, "")), default)
+    date = parse_date(pick("date", None)) or fallback_date or datetime.now().isoformat()
+    temp = pick("temp", "--")
+    if isinstance(temp, (int, float)): temp = f"{round(temp)}°C"
+    entry = {
+        "title": str(pick("title", fallback_title)),
+        "date": date,
+        "content": str(pick("content", "")),
+        "city": str(pick("city", "")),
+        "weather": str(pick("weather", "Clear")),
+        "temp": str(temp),
+    }
+    if obj.get("id"): entry["id"] = str(obj["id"])
+    return entry
+
+
+# NOTE FILES (run in worker processes)
+# ------------------------------------------------------------------
+FRONT_MATTER_RE = re.compile(r"\A---\n(.*?)\n---\n", re.S)
+HEADING_RE = re.compile(r"\A\s*#{1,6}\s+(.+)\n?")
+
+
+def parse_note(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f: text = f.read()
+    fields = {}
+    m = FRONT_MATTER_RE.match(text)
+    if m:
+        for line in m.group(1).splitlines():
+            key, sep, value = line.partition(":")
+            if sep: fields[key.strip().lower()] = value.strip()
+        text = text[m.end():]
+
+    m = HEADING_RE.match(text)
+    if m and "title" not in fields:
+        fields["title"] = m.group(1).strip()
+        text = text[m.end():]
+    elif "title" not in fields:
+        first = text.strip().split("\n", 1)[0].strip()
+        fields["title"] = first[:80] or os.path.splitext(os.path.basename(path))[0]
+
+    fields["content"] = text.strip()
+    mtime = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+    return normalize(fields, os.path.splitext(os.path.basename(path))[0], mtime)
+
+
+def parse_notes(paths):
+    return [parse_note(p) for p in paths]
+
+
+# JSON DUMPS (streamed in the calling process)
+# ------------------------------------------------------------------
+class JsonStream:
+    """Sliding window over a JSON text file, decoding one value at a time"""
+    def __init__(self, f):
+        self.f = f
+        self.buf, self.pos, self.eof = "", 0, False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self, size=None):
+        chunk = self.f.read(size or READ_CHUNK)
+        self.buf, self.pos, self.eof = self.buf[self.pos:] + chunk, 0, not chunk
+
+    def peek(self, skip=WHITESPACE):
+        """Next character after any in `skip`, or "" at the end of the input"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof: return self.buf[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, char):
+        if self.peek() != char: raise ValueError(f"Expecting {char!r} near: {self.buf[self.pos:self.pos + 40]!r}")
+        self.pos += 1
+
+    def value(self, grow=True):
+        """Decodes the next value. With grow=False, returns TOO_BIG rather than buffer more than a couple of chunks"""
+        size = READ_CHUNK
+        while True:
+            try:
+                value, self.pos = self.decoder.raw_decode(self.buf, self.pos)
+                return value
+            except ValueError:
+                if self.eof: raise
+                if not grow and len(self.buf) - self.pos > READ_CHUNK: return TOO_BIG
+                # Each retry re-parses the value from its start, so read geometrically more
+                self.fill(size)
+                size *= 2
+
+
+def iter_json_values(f):
+    """Yields values from a JSON array, JSON lines, or a bare object, reading in chunks"""
+    stream = JsonStream(f)
+    in_array = False
+    while True:
+        # Skip whitespace and array punctuation between values
+        c = stream.peek(WHITESPACE + ",]")
+        if not c: return
+        if c == "[" and not in_array:
+            in_array = True; stream.pos += 1
+            continue
+        value = stream.value(grow=c != "{")
+        if value is TOO_BIG: yield from iter_object_members(stream)
+        else: yield value
+
+
+def iter_object_members(stream):
+    """An object too big to decode whole, such as {"entries": [...]}: lists of objects are yielded
+    element by element as they are read, the rest once the object is closed"""
+    stream.expect("{")
+    members, wrapper = {}, False
+    while stream.peek(WHITESPACE + ",") != "}":
+        key = stream.value()
+        stream.expect(":")
+        if stream.peek() == "[":
+            stream.pos += 1
+            if stream.peek() != "{":
+                stream.pos -= 1  # not a list of records: keep it as a field
+                members[key] = stream.value()
+                continue
+            while stream.peek(WHITESPACE + ",") != "]":
+                item = stream.value()
+                wrapper = wrapper or isinstance(item, dict) and is_record(item)
+                yield item
+            stream.pos += 1
+        else:
+            members[key] = stream.value()
+    stream.pos += 1
+    # A wrapper's other fields are only searched for more records, never taken as one;
+    # otherwise this is one big record (a long body)
+    if wrapper: yield from (v for v in members.values() if isinstance(v, (dict, list)))
+    else: yield members
+
+
+def has_field(obj, field):
+    return any(obj.get(k) not in (None, "") for k in FIELD_ALIASES[field])
+
+
+def is_record(obj):
+    return "op" in obj or has_field(obj, "title") or has_field(obj, "content")
+
+
+def holds_records(obj):
+    """A wrapper like {"title": "My Export", "entries": [...]} rather than an entry"""
+    return any(isinstance(v, list) and any(isinstance(item, dict) and is_record(item) for item in v) for v in obj.values())
+
+
+def iter_records(value):
+    """Entry-like dicts in a dump value, descending into wrappers like {"entries": [...]}"""
+    if isinstance(value, list):
+        for item in value: yield from iter_records(item)
+        return
+    if not isinstance(value, dict): return
+    if value.get("op") == "put" and isinstance(value.get("entry"), dict):
+        yield dict(value["entry"], id=value["id"])  # a journal log
+    elif "op" in value:
+        return
+    elif is_record(value) and not holds_records(value):
+        yield value
+    else:
+        for v in value.values():
+            if isinstance(v, dict) or isinstance(v, list) and any(isinstance(item, dict) for item in v):
+                yield from iter_records(v)
+
+
+def iter_dump(path):
+    mtime = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+    with open(path, "r", encoding="utf-8") as f:
+        for obj in iter_json_values(f):
+            for record in iter_records(obj):
+                yield normalize(record, fallback_date=mtime)
+
+
+# PIPELINE
+# ------------------------------------------------------------------
+def discover(paths):
+    """Splits inputs (files or directories) into note files and JSON dumps"""
+    notes, dumps = [], []
+    for p in paths:
+        files = [p] if os.path.isfile(p) else (os.path.join(r, n) for r, _, names in os.walk(p) for n in sorted(names))
+        for full in files:
+            ext = os.path.splitext(full)[1].lower()
+            if ext in NOTE_EXTS: notes.append(full)
+            elif ext in DUMP_EXTS: dumps.append(full)
+    return notes, dumps
+
+
+def iter_import_batches(paths, batch_size=200, workers=None):
+    """Yields lists of at most batch_size entries from every file under paths"""
+    notes, dumps = discover(paths)
+
+    if notes:
+        workers = workers or min(os.cpu_count() or 1, 8)
+        # spawn keeps Tk and the app's threads out of the workers
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending, chunks = [], (notes[i:i + batch_size] for i in range(0, len(notes), batch_size))
+            for chunk in chunks:
+                pending.append(pool.submit(parse_notes, chunk))
+                # At most two batches per worker in flight keeps memory bounded
+                if len(pending) >= workers * 2:
+                    yield pending.pop(0).result()
+            for fut in pending:
+                yield fut.result()
+
+    batch = []
+    for path in dumps:
+        for entry in iter_dump(path):
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                yield batch; batch = []
+    if batch: yield batch
+
+
+def export_entries(entries, dest, fmt="jsonl"):
+    """Streams entries to dest as jsonl, a json array, or a directory of markdown notes"""
+    count = 0
+    if fmt == "markdown":
+        os.makedirs(dest, exist_ok=True)
+        for e in entries:
+            slug = re.sub(r"[^\w]+", "-", e.get("title", "")).strip("-").lower()[:50] or "entry"
+            name = f"{e.get('date', '')[:10]}-{slug}-{e['id'][:8]}.md"
+            with open(os.path.join(dest, name), "w", encoding="utf-8") as f:
+                f.write("---\n")
+                for k in ("date", "city", "weather", "temp"): f.write(f"{k}: {e.get(k, '')}\n")
+                f.write(f"---\n# {e.get('title', '')}\n\n{e.get('content', '')}\n")
+            count += 1
+        return count
+
+    with open(dest, "w", encoding="utf-8") as f:
+        if fmt == "json": f.write("[\n")
+        for e in entries:
+            if fmt == "json" and count: f.write(",\n")
+            f.write(json.dumps(e, ensure_ascii=False))
+            if fmt == "jsonl": f.write("\n")
+            count += 1
+        if fmt == "json": f.write("\n]\n")
+    return count
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from journal_store import JournalStore
+from search_index import SearchIndex
+from sorted_index import SortedIndexes, RELEVANCE
+
+
+# JOURNAL MODEL (UI-INDEPENDENT)
+# ------------------------------------------------------------------
+# Entries, persistence, search and sorting without any Tk. The window only
+# talks to this layer, which also lets the benchmarks drive it headless.
+
+TITLE_BATCH = 2000
+TEXT_BATCH = 32  # bodies per search index transaction, so a save never waits long on the indexer
+
+class JournalModel:
+    def __init__(self, store=None):
+        self.store = store or JournalStore()
+        self.search_index = SearchIndex(os.path.splitext(self.store.path)[0] + ".fts")
+        self.sorted_index = SortedIndexes()
+        self._analytics = None
+        self.entries_by_id = {}
+        self.bodies_left = 0
+        self.word_backfill = deque()  # (id, words) from the body indexer, applied on the caller's thread
+        self.closed = False
+        self.indexer = None
+
+    def __len__(self):
+        return len(self.entries_by_id)
+
+    @property
+    def analytics(self):
+        """Column cache for Insights, built on first use (NumPy is slow to import)"""
+        if self._analytics is None:
+            from analytics import JournalAnalytics
+            self._analytics = JournalAnalytics(max(len(self.entries_by_id), 1024))
+            self._analytics.add_many(self.entries_by_id.values())
+        return self._analytics
+
+    def load(self):
+        """Loads metadata for every entry and starts indexing whatever the search index lacks"""
+        return self.install(self.read_archive())
+
+    def read_archive(self):
+        """Opens the store and builds the metadata indexes without touching the model,
+        so it can run on a worker thread. Pass the result to install()"""
+        entries = self.store.load()
+        search_index = SearchIndex(self.search_index.path)
+        unindexed = search_index.load(entries)
+        sorted_index = SortedIndexes(entries)
+        sorted_index.label("date")  # the default sort mode, so the first filtered Library view doesn't build it
+        search_index.release()
+        return entries, {e["id"]: e for e in entries}, sorted_index, search_index, unindexed
+
+    def install(self, archive):
+        entries, self.entries_by_id, self.sorted_index, self.search_index, unindexed = archive
+        self._analytics = None
+        # The search index is kept on disk, so only entries saved since it was last
+        # updated (or all of them, the first time) are indexed, on a worker
+        self.bodies_left = len(unindexed)
+        if unindexed:
+            self.indexer = threading.Thread(target=self._index_worker, args=(self.search_index, unindexed),
+                                            name="search-indexer", daemon=True)
+            self.indexer.start()
+        return entries
+
+    def _index_worker(self, index, unindexed):
+        try:
+            # Titles first: they need no body reads, so title search is complete within seconds
+            for i in range(0, len(unindexed), TITLE_BATCH):
+                if self.closed or index is not self.search_index: return  # shut down or reloaded
+                metas = (self.entries_by_id.get(entry_id) for entry_id in unindexed[i:i + TITLE_BATCH])
+                index.add_text([m for m in metas if m is not None], fill=True)
+            for i in range(0, len(unindexed), TEXT_BATCH):
+                if self.closed or index is not self.search_index: return
+                entries = list(self.store.iter_entries(unindexed[i:i + TEXT_BATCH]))
+                index.add_text(entries, fill=True)
+                self.word_backfill.extend((e["id"], len(e.get("content", "").split())) for e in entries)
+                self.bodies_left = max(len(unindexed) - i - TEXT_BATCH, 0)
+                if i % (TEXT_BATCH * 64) == 0: index.checkpoint()
+            index.checkpoint()
+        except (ValueError, AttributeError, sqlite3.Error):
+            if not self.closed: raise
+        finally:
+            self.bodies_left = 0
+
+    def index_bodies(self):
+        """Applies word counts the body indexer found. True while it is still running"""
+        while self.word_backfill:
+            entry_id, words = self.word_backfill.popleft()
+            meta = self.entries_by_id.get(entry_id)
+            if meta is not None and "words" not in meta:
+                # Index written before word counts were tracked: backfill from the body
+                meta["words"] = words
+                if self._analytics: self._analytics.set_words(entry_id, words)
+        return self.bodies_left > 0
+
+    def save(self, entry):
+        """Persists a full entry and returns its metadata"""
+        old = self.entries_by_id.get(entry.get("id"))
+        if old: self.sorted_index.remove(old)
+        meta = self.store.put(entry)
+        self.entries_by_id[meta["id"]] = meta
+        self.search_index.add(meta["id"], entry)
+        self.sorted_index.add(meta)
+        if self._analytics: self._analytics.add(meta)
+        return meta
+
+    def prepare_batch(self, entries):
+        """Indexes the text of an import batch ahead of save_many(entries, indexed=True), on the
+        import worker: tokenizing is most of a batch's cost. Searches only find the entries once saved"""
+        for e in entries: e.setdefault("id", uuid.uuid4().hex)
+        index = self.search_index
+        for i in range(0, len(entries), TEXT_BATCH):
+            index.add_text(entries[i:i + TEXT_BATCH])
+        index.checkpoint()
+        return entries
+
+    def save_many(self, entries, indexed=False):
+        """Persists a batch of full entries with one store write"""
+        for e in entries:
+            old = self.entries_by_id.get(e.get("id"))
+            if old: self.sorted_index.remove(old)
+        metas = self.store.put_many(entries)
+        for meta in metas:
+            self.entries_by_id[meta["id"]] = meta
+            self.search_index.add_meta(meta["id"], meta)
+        if not indexed: self.search_index.add_text(entries)
+        self.sorted_index.add_many(metas)
+        if self._analytics: self._analytics.add_many(metas)
+        return metas
+
+    def get_content(self, entry_id):
+        return self.store.get_content(entry_id)
+
+    def query(self, text="", mode="Date (Newest)"):
+        """Entries matching `text`, in `mode` order (a sequence, not necessarily a list)"""
+        text = text.strip()
+        if not text: return self.sorted_index.view(mode, self.entries_by_id)
+        found = self.search_index.search(text, ranked=mode == RELEVANCE)
+        if found is None: return self.sorted_index.view(mode, self.entries_by_id)  # still typing a short word
+        # Best Match keeps relevance order, every other mode is a view over its sorted index
+        if mode == RELEVANCE: return [self.entries_by_id[i] for i in found]
+        return self.sorted_index.view(mode, self.entries_by_id, found)
+
+    def close(self):
+        self.closed = True
+        if self.indexer: self.indexer.join()  # stops after its current batch
+        self.search_index.close()
+        self.store.close()
@@ -0,0 +1,357 @@
+import json
+import mmap
+import os
+import threading
+import time
+import atexit
+import uuid
+from collections import OrderedDict
+
+
+# APPEND-ONLY JOURNAL LOG
+# ------------------------------------------------------------------
+# Every save / edit / delete is one JSON record on its own line:
+#   {"op": "put", "id": "...", "entry": {...}}
+#   {"op": "del", "id": "..."}
+# Writes only touch the end of the file, so save cost does not grow with the
+# archive. fsync is batched on a background thread and superseded records are
+# compacted away in the background once they outnumber the live ones.
+#
+# A sidecar index (.idx) mirrors the log with one small line per record:
+#   {"op": "put", "id": "...", "meta": {title, date, city, weather, temp, words}, "off": 0, "len": 123}
+# Startup reads only the index, so only metadata is resident. Entry bodies
+# are sliced out of an mmap of the log when opened and kept in a small LRU.
+# The index is derived data: any part missing after a crash is rebuilt from
+# the log tail.
+
+META_FIELDS = ("title", "date", "city", "weather", "temp")
+
+
+def entry_meta(entry, entry_id):
+    meta = {k: entry[k] for k in META_FIELDS if k in entry}
+    if "content" in entry: meta["words"] = len(entry["content"].split())
+    meta["id"] = entry_id
+    return meta
+
+
+class JournalStore:
+    def __init__(self, path="context_journal_final.log", legacy_path="context_journal_final.json",
+                 flush_interval=0.5, compact_min_garbage=500, body_cache_size=32):
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self.legacy_path = legacy_path
+        self.flush_interval = flush_interval
+        self.compact_min_garbage = compact_min_garbage
+        self.body_cache_size = body_cache_size
+
+        self._live = {}
+        self._loc = {}
+        self._bodies = OrderedDict()
+        self._records = 0
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._closed = False
+        self._compacting = False
+        self._file = None
+        self._index = None
+        self._reader = None
+        self._mm = None
+        self._flusher = None
+
+    # REPLAY & MIGRATION
+    # ------------------------------------------------------------------
+    def load(self):
+        """Loads entry metadata (no bodies), newest first"""
+        if not os.path.exists(self.path) and self.legacy_path and os.path.exists(self.legacy_path):
+            self._migrate_legacy()
+
+        self._live, self._loc, self._records = {}, {}, 0
+        log_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+        indexed_end = self._read_index(log_size)
+        tail = self._scan_log(indexed_end) if indexed_end < log_size else []
+
+        self._open()
+        with self._lock:
+            for rec, off, length in tail:
+                self._index.write(self._index_line(rec, off, length))
+        return list(reversed(self._live.values()))
+
+    def _read_index(self, log_size):
+        """Replays the sidecar index, returns the log offset it covers up to"""
+        if not os.path.exists(self.index_path): return 0
+        good_end, indexed_end = 0, 0
+        with open(self.index_path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"): break
+                try:
+                    rec = json.loads(raw)
+                    end = rec["off"] + rec["len"]
+                except (ValueError, KeyError, TypeError):
+                    break
+                if end > log_size:
+                    # Index ran ahead of the log (crash before the log hit disk): rebuild it
+                    self._live, self._loc, self._records = {}, {}, 0
+                    good_end = indexed_end = 0
+                    break
+                self._apply(rec, rec["off"], rec["len"])
+                good_end += len(raw); indexed_end = end
+
+        if good_end < os.path.getsize(self.index_path):
+            with open(self.index_path, "r+b") as f: f.truncate(good_end)
+        return indexed_end
+
+    def _scan_log(self, start):
+        """Replays log records from `start`, truncating a torn last record"""
+        found, good_end = [], start
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    rec = json.loads(raw)
+                    if rec["op"] == "put": rec["meta"] = entry_meta(rec.pop("entry"), rec["id"])
+                    self._apply(rec, good_end, len(raw))
+                    found.append((rec, good_end, len(raw)))
+                except (ValueError, KeyError, TypeError):
+                    # A bad record in the middle is skipped, only the tail is truncated
+                    pass
+                good_end += len(raw)
+
+        if good_end < os.path.getsize(self.path):
+            # Torn tail from a crash mid-write: drop the partial record
+            with open(self.path, "r+b") as f: f.truncate(good_end)
+        return found
+
+    def _apply(self, rec, off, length):
+        if rec["op"] == "put":
+            self._live[rec["id"]] = rec["meta"]
+            self._loc[rec["id"]] = (off, length)
+        elif rec["op"] == "del":
+            self._live.pop(rec["id"], None)
+            self._loc.pop(rec["id"], None)
+        self._records += 1
+
+    def _migrate_legacy(self):
+        with open(self.legacy_path, "r") as f: legacy = json.load(f)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            # Legacy file is newest first, the log is oldest first
+            for entry in reversed(legacy):
+                entry.setdefault("id", uuid.uuid4().hex)
+                f.write(self._encode({"op": "put", "id": entry["id"], "entry": entry}))
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if os.path.exists(self.index_path): os.remove(self.index_path)
+
+    # READS
+    # ------------------------------------------------------------------
+    def get_content(self, entry_id):
+        """Body of one entry, read on demand and kept in a small LRU"""
+        body = self._bodies.get(entry_id)
+        if body is not None:
+            self._bodies.move_to_end(entry_id)
+            return body
+        body = self.read_entry(entry_id).get("content", "")
+        self._cache_body(entry_id, body)
+        return body
+
+    def read_entry(self, entry_id):
+        """Full entry straight from the log, bypassing the body cache"""
+        with self._lock:
+            off, length = self._loc[entry_id]
+            if self._mm is None or off + length > len(self._mm):
+                self._file.flush()
+                self._remap()
+            raw = self._mm[off:off + length]
+        rec = json.loads(raw)
+        return dict(rec["entry"], id=rec["id"])
+
+    def iter_entries(self, ids=None):
+        """Streams full live entries, oldest first, or those in `ids`. Uses plain reads rather than
+        the mmap, so a pass over the whole archive doesn't leave it all mapped into the process"""
+        for entry_id in list(self._live) if ids is None else ids:
+            with self._lock:
+                if entry_id not in self._loc: continue  # deleted while streaming
+                off, length = self._loc[entry_id]
+                self._file.flush()
+                raw = os.pread(self._reader.fileno(), length, off)
+            rec = json.loads(raw)
+            yield dict(rec["entry"], id=rec["id"])
+
+    def _cache_body(self, entry_id, body):
+        self._bodies[entry_id] = body
+        self._bodies.move_to_end(entry_id)
+        while len(self._bodies) > self.body_cache_size:
+            self._bodies.popitem(last=False)
+
+    def _remap(self):
+        if self._mm is not None: self._mm.close(); self._mm = None
+        if os.fstat(self._reader.fileno()).st_size:
+            self._mm = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # WRITES
+    # ------------------------------------------------------------------
+    def put(self, entry):
+        """Appends a save/edit record and returns the entry's metadata"""
+        entry.setdefault("id", uuid.uuid4().hex)
+        meta = entry_meta(entry, entry["id"])
+        self._append({"op": "put", "id": entry["id"], "entry": entry}, {"op": "put", "id": entry["id"], "meta": meta})
+        self._cache_body(entry["id"], entry.get("content", ""))
+        return meta
+
+    def put_many(self, entries):
+        """Appends a batch of entries with one write and one lock round-trip"""
+        lines, index_lines, recs = [], [], []
+        for entry in entries:
+            entry.setdefault("id", uuid.uuid4().hex)
+            recs.append({"op": "put", "id": entry["id"], "meta": entry_meta(entry, entry["id"])})
+            lines.append(self._encode({"op": "put", "id": entry["id"], "entry": entry}))
+        with self._lock:
+            off = self._file.tell()
+            for rec, line in zip(recs, lines):
+                index_lines.append(self._index_line(rec, off, len(line)))
+                self._apply(rec, off, len(line))
+                off += len(line)
+            self._file.write(b"".join(lines))
+            self._index.write(b"".join(index_lines))
+        self._dirty.set()
+        self._maybe_compact()
+        return [rec["meta"] for rec in recs]
+
+    def delete(self, entry_id):
+        rec = {"op": "del", "id": entry_id}
+        self._append(rec, rec)
+        self._bodies.pop(entry_id, None)
+
+    def _append(self, rec, index_rec):
+        line = self._encode(rec)
+        with self._lock:
+            off = self._file.tell()
+            self._file.write(line)
+            self._index.write(self._index_line(index_rec, off, len(line)))
+            self._apply(index_rec, off, len(line))
+        self._dirty.set()
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if not self._compacting and self._records - len(self._live) > max(self.compact_min_garbage, len(self._live)):
+            self._start_compaction()
+
+    def _encode(self, rec):
+        return (json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _index_line(self, rec, off, length):
+        return self._encode(dict(rec, off=off, len=length))
+
+    def _open(self):
+        if self._file: return
+        self._file = open(self.path, "ab")
+        self._index = open(self.index_path, "ab")
+        self._reader = open(self.path, "rb")
+        self._remap()
+        self._flusher = threading.Thread(target=self._flush_loop, name="journal-fsync", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._dirty.wait()
+            if self._closed: break
+            # Let a burst of saves pile up so they share one fsync
+            self._dirty.clear()
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._file: return
+            self._file.flush()
+            # fsync on a duplicate fd outside the lock, so saves never wait on the disk.
+            # The dup stays valid even if compaction swaps the log file meanwhile
+            fd = os.dup(self._file.fileno())
+        try: os.fsync(fd)
+        except OSError: pass
+        finally: os.close(fd)
+        with self._lock:
+            # Log first: the index must never point past what is durable in the log
+            if self._index: self._index.flush()
+
+    def close(self):
+        if self._closed: return
+        self._closed = True
+        self._dirty.set()
+        self.flush()
+        with self._lock:
+            if self._mm is not None: self._mm.close(); self._mm = None
+            for f in (self._file, self._index, self._reader):
+                if f: f.close()
+            self._file = self._index = self._reader = None
+
+    # COMPACTION
+    # ------------------------------------------------------------------
+    def _start_compaction(self):
+        self._compacting = True
+        threading.Thread(target=self._compact, name="journal-compact", daemon=True).start()
+
+    def _compact(self):
+        try:
+            with self._lock:
+                if not self._file: return
+                self._file.flush()
+                snapshot = [(entry_id, meta, self._loc[entry_id]) for entry_id, meta in self._live.items()]
+                copied_to = self._file.tell()
+
+            tmp, tmp_index = self.path + ".compact", self.index_path + ".compact"
+            loc, records = {}, len(snapshot)
+            with open(tmp, "wb") as out, open(tmp_index, "wb") as out_index, open(self.path, "rb") as src:
+                # Live records are copied byte for byte, no re-encoding
+                for entry_id, meta, (off, length) in snapshot:
+                    src.seek(off)
+                    loc[entry_id] = (out.tell(), length)
+                    out.write(src.read(length))
+                    out_index.write(self._index_line({"op": "put", "id": entry_id, "meta": meta}, *loc[entry_id]))
+
+                # Catch up on what was appended meanwhile and make the bulk durable, still without the lock
+                with self._lock:
+                    if not self._file: return
+                    self._file.flush()
+                    end = self._file.tell()
+                records += self._copy_tail(src, out, out_index, loc, copied_to, end)
+                copied_to = end
+                out.flush(); os.fsync(out.fileno())
+
+                with self._lock:
+                    if not self._file: return
+                    # Only the few records appended since that fsync are copied and synced under the lock
+                    self._file.flush()
+                    records += self._copy_tail(src, out, out_index, loc, copied_to, self._file.tell())
+                    out.flush(); os.fsync(out.fileno())
+                    out_index.flush()
+                    if self._mm is not None: self._mm.close(); self._mm = None
+                    for f in (self._file, self._index, self._reader): f.close()
+                    os.replace(tmp, self.path)
+                    os.replace(tmp_index, self.index_path)
+                    self._file = open(self.path, "ab")
+                    self._index = open(self.index_path, "ab")
+                    self._reader = open(self.path, "rb")
+                    self._remap()
+                    self._loc, self._records = loc, records
+        finally:
+            self._compacting = False
+
+    def _copy_tail(self, src, out, out_index, loc, start, end):
+        """Copies log records in [start, end) to the compacted log, returns how many"""
+        src.seek(start)
+        lines = src.read(end - start).splitlines(keepends=True)
+        for raw in lines:
+            rec = json.loads(raw)
+            if rec["op"] == "put":
+                rec = {"op": "put", "id": rec["id"], "meta": entry_meta(rec["entry"], rec["id"])}
+                loc[rec["id"]] = (out.tell(), len(raw))
+            else:
+                loc.pop(rec["id"], None)
+            out_index.write(self._index_line(rec, out.tell(), len(raw)))
+            out.write(raw)
+        return len(lines)
@@ -1,22 +1,35 @@
+import time
+STARTED = time.perf_counter()  # zero point for the startup report
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from ttkbootstrap.scrolled import ScrolledFrame
-from ttkbootstrap.dialogs import Querybox
-from tkinter import filedialog, Canvas, font as tkfont
+from tkinter import Canvas
+import argparse
+import atexit
 import json
 import os
-import requests
 from datetime import datetime
 import random
+import queue
+import threading
+from journal_model import JournalModel
+from history_view import VirtualHistoryList
+from weather_service import WeatherService
+from render_cache import RenderCache
+from text_stats import TextStats
+from sorted_index import SORT_MODES, RELEVANCE
+from frame_scheduler import FrameScheduler
+from drafts import DraftJournal
 
 class AtmosphericJournal:
-    def __init__(self, root):
+    def __init__(self, root, report_startup=False):
         self.root = root
         self.root.title("Atmospheric Journal - Meta Context Edition")
         self.root.geometry("1600x950")
         
         self.weather_api_key = "key-here" 
         self.current_city = "London"
+        self.weather = WeatherService(self.weather_api_key)
+        self.snapshot_path = "atmosphere_snapshot.json"
         
         # Weather Cache
         self.live_temp = "--"
@@ -40,10 +53,18 @@ class AtmosphericJournal:
        
         # STATES
         # ------------------------------------------------------------------
-        self.entries = []
+        self.model = JournalModel()
+        self.search_job = None
         self.current_font_size = 15
         self.current_font_family = "Segoe UI"
         self.history_visible = True
+        self.history_list = None
+        self.archive_ready = False
+        self.font_menu = None
+        self.report_startup = report_startup
+        self.startup_times = {}
+        self.render_cache = RenderCache(self.root)
+        self.scheduler = FrameScheduler(self.root)
         
         self.quotes = [
             "Every moment is a fresh beginning.",
@@ -57,45 +78,54 @@ class AtmosphericJournal:
         self.quote_index = 0
         self.typing_forward = True
         self.quote_text_id = None
+        self.quote_text = ""
 
-        self.load_entries()
+        self.load_snapshot()
         self.setup_ui()
+        self.drafts = DraftJournal()
+        self.restore_draft()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # ------------------------------------------------------------------
-        # SAFETY INITIALIZATION SEQUENCE
+        # FAST FIRST FRAME
         # ------------------------------------------------------------------
-        # Force the window to calculate sizes before we try to draw context
-        self.root.update_idletasks()
-        self.root.update()
-        
-        # Now trigger the atmosphere safely
-        self.apply_contextual_atmosphere()
-        self.animate_quote()
+        # The first frame is painted from the last session's city and atmosphere.
+        # The archive, the Library list, the live weather lookup and the quote
+        # animation all wait until the editor is on screen, and the archive is
+        # then read on a worker thread so typing is never blocked on it.
+        self.render_atmosphere()
+        self.text_area.focus_set()
+        self.text_area.bind("<Map>", self.on_first_map)
 
     
     # CONTEXTUAL ENGINE METHODS
     # ------------------------------------------------------------------
-    def get_live_weather(self, city):
-        if self.weather_api_key == "YOUR_OPENWEATHER_API_KEY":
-            return "22°C", "Clear", "45%"
-        
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={self.weather_api_key}&units=metric"
-        try:
-            response = requests.get(url, timeout=5)
-            data = response.json()
-            if data.get("cod") == 200:
-                t = f"{round(data['main']['temp'])}°C"
-                c = data['weather'][0]['main'] 
-                h = f"{data['main']['humidity']}%"
-                return t, c, h
-            return "N/A", "Clear", "--"
-        except:
-            return "Offline", "Clear", "--"
+    def get_live_weather(self, city, on_result):
+        """Fetches off the Tk thread; on_result runs on the Tk thread via root.after"""
+        future = self.weather.fetch(city)
+        def poll():
+            if not future.done(): self.root.after(50, poll); return
+            try: reading = future.result()
+            except Exception: reading = ("Offline", "Clear", "--")
+            on_result(city, reading)
+        poll()
 
     def apply_contextual_atmosphere(self):
         """Orchestrates the global UI shift based on environment"""
-        self.live_temp, self.live_condition, self.live_humidity = self.get_live_weather(self.current_city)
-        
+        # Paint right away from the last known reading, then refresh in the background
+        cached = self.weather.last_known(self.current_city)
+        if cached: self.live_temp, self.live_condition, self.live_humidity = cached
+        self.render_atmosphere()
+        self.get_live_weather(self.current_city, self.on_weather_result)
+
+    def on_weather_result(self, city, reading):
+        if city != self.current_city: return  # user switched city while this was in flight
+        self.save_snapshot(reading)
+        if reading == (self.live_temp, self.live_condition, self.live_humidity): return
+        self.live_temp, self.live_condition, self.live_humidity = reading
+        self.render_atmosphere()
+
+    def render_atmosphere(self):
         style = self.atmosphere_map.get(self.live_condition, self.atmosphere_map["Clear"])
         
         # Update Editor Colors
@@ -112,14 +142,12 @@ class AtmosphericJournal:
             foreground=style["accent"]
         )
         
-        # Refresh all canvas drawings with current geometry
-        self.draw_header_gradient(None)
-        self.draw_title_card(None)
-        self.draw_toolbar_card(None)
-        self.draw_editor_bg(None)
-        self.draw_history_bg(None)
+        # Refresh all canvas drawings with current geometry, batched into the next frame
+        for draw in (self.draw_header_gradient, self.draw_title_card, self.draw_toolbar_card, self.draw_editor_bg, self.draw_history_bg):
+            self.schedule_redraw(draw)
 
     def change_city_dialog(self):
+        from ttkbootstrap.dialogs import Querybox
         new_city = Querybox.get_string(prompt="Enter City Name:", title="Update Atmosphere", initialvalue=self.current_city)
         if new_city:
             self.current_city = new_city.strip().title()
@@ -138,7 +166,7 @@ class AtmosphericJournal:
         self.header.pack_propagate(False)
         self.header_canvas = Canvas(self.header, height=140, highlightthickness=0)
         self.header_canvas.pack(fill=BOTH, expand=YES)
-        self.header_canvas.bind("<Configure>", self.draw_header_gradient)
+        self.header_canvas.bind("<Configure>", lambda e: self.schedule_redraw(self.draw_header_gradient))
 
         # 2. MAIN LAYOUT
         self.content_frame = tb.Frame(self.main_container, bootstyle=LIGHT)
@@ -156,7 +184,7 @@ class AtmosphericJournal:
         title_card.pack(fill=X, pady=(0, 20))
         self.title_canvas = Canvas(title_card, height=80, bg="#f7f9fc", highlightthickness=0)
         self.title_canvas.pack(fill=BOTH, expand=YES)
-        self.title_canvas.bind("<Configure>", self.draw_title_card)
+        self.title_canvas.bind("<Configure>", lambda e: self.schedule_redraw(self.draw_title_card))
         self.title_var = tb.StringVar(value="Untitled Entry")
         self.title_entry = tb.Entry(title_card, textvariable=self.title_var, font=("Segoe UI", 16, "bold"), bootstyle=PRIMARY)
         self.title_entry.place(relx=0.03, rely=0.25, relwidth=0.94, relheight=0.5)
@@ -166,13 +194,14 @@ class AtmosphericJournal:
         toolbar_card.pack(fill=X, pady=(0, 20))
         self.toolbar_canvas = Canvas(toolbar_card, height=90, bg="#f7f9fc", highlightthickness=0)
         self.toolbar_canvas.pack(fill=BOTH, expand=YES)
-        self.toolbar_canvas.bind("<Configure>", self.draw_toolbar_card)
+        self.toolbar_canvas.bind("<Configure>", lambda e: self.schedule_redraw(self.draw_toolbar_card))
 
         self.tool_frame = tb.Frame(toolbar_card, bootstyle=LIGHT)
         self.tool_frame.place(relx=0.03, rely=0.15, relwidth=0.94, relheight=0.7)
         
         tb.Button(self.tool_frame, text="Typography", bootstyle="outline-primary", command=self.show_font_menu).pack(side=LEFT, padx=5)
         tb.Button(self.tool_frame, text="B", bootstyle="outline-primary", command=self.toggle_bold, width=4).pack(side=LEFT, padx=5)
+        tb.Button(self.tool_frame, text="Insights", bootstyle="outline-primary", command=self.show_insights).pack(side=LEFT, padx=5)
         
         weather_info_f = tb.Frame(self.tool_frame, bootstyle=LIGHT)
         weather_info_f.pack(side=RIGHT, padx=10)
@@ -189,7 +218,7 @@ class AtmosphericJournal:
         editor_card.pack(fill=BOTH, expand=YES)
         self.editor_bg_canvas = Canvas(editor_card, bg="#f7f9fc", highlightthickness=0)
         self.editor_bg_canvas.pack(fill=BOTH, expand=YES)
-        self.editor_bg_canvas.bind("<Configure>", self.draw_editor_bg)
+        self.editor_bg_canvas.bind("<Configure>", lambda e: self.schedule_redraw(self.draw_editor_bg))
 
         self.text_frame = tb.Frame(editor_card)
         self.text_frame.place(relx=0.05, rely=0.15, relwidth=0.9, relheight=0.75)
@@ -198,22 +227,28 @@ class AtmosphericJournal:
         self.text_area = tb.Text(self.text_frame, font=(self.current_font_family, self.current_font_size), wrap=WORD, undo=True, padx=25, pady=25, borderwidth=0, highlightthickness=0, yscrollcommand=self.text_scroll.set)
         self.text_area.pack(side=LEFT, fill=BOTH, expand=YES)
         self.text_scroll.config(command=self.text_area.yview)
-        self.text_area.bind('<KeyRelease>', self.update_char_count)
+        self.text_stats = TextStats(self.text_area, self.update_char_count)
 
         # Footer
         action_bar = tb.Frame(self.editor_container, bootstyle=LIGHT)
         action_bar.pack(fill=X, pady=(20, 0))
         tb.Button(action_bar, text="New Entry", bootstyle=SECONDARY, command=self.new_entry, width=15).pack(side=LEFT, ipady=10)
-        self.save_btn = tb.Button(action_bar, text="Save Atmosphere", bootstyle=PRIMARY, command=self.save_entry, width=25)
+        # Enabled once the archive is open (on_archive_read)
+        self.save_btn = tb.Button(action_bar, text="Save Atmosphere", bootstyle=PRIMARY, command=self.save_entry, width=25, state=DISABLED)
         self.save_btn.pack(side=RIGHT, ipady=10)
 
-        # 4. LIBRARY
+        # 4. LIBRARY (card only, the list is filled in by build_library after the first paint)
         self.hist_bg_canvas = Canvas(self.history_frame, bg="#f7f9fc", highlightthickness=0)
         self.hist_bg_canvas.pack(fill=BOTH, expand=YES)
-        self.hist_bg_canvas.bind("<Configure>", self.draw_history_bg)
+        self.hist_bg_canvas.bind("<Configure>", lambda e: self.schedule_redraw(self.draw_history_bg))
+
+    def build_library_card(self):
         self.hist_content = tb.Frame(self.history_frame, bootstyle=LIGHT)
         self.hist_content.place(relx=0.05, rely=0.02, relwidth=0.9, relheight=0.96)
         tb.Label(self.hist_content, text="Library", font=("Segoe UI", 22, "bold")).pack(anchor=W, pady=(10, 5))
+
+    def build_library(self):
+        self.build_library_card()
         
         search_frame = tb.Frame(self.hist_content)
         search_frame.pack(fill=X, pady=(0, 20))
@@ -221,23 +256,87 @@ class AtmosphericJournal:
         self.search_var.trace('w', self.filter_entries)
         tb.Entry(search_frame, textvariable=self.search_var, bootstyle=PRIMARY).pack(fill=X, pady=(0, 10))
         self.sort_var = tb.StringVar(value="Date (Newest)")
-        tb.Combobox(search_frame, textvariable=self.sort_var, values=["Date (Newest)", "Date (Oldest)", "Title (A-Z)"], state="readonly").pack(fill=X)
+        self.sort_var.trace('w', lambda *args: self.run_search())
+        tb.Combobox(search_frame, textvariable=self.sort_var, values=list(SORT_MODES) + [RELEVANCE], state="readonly").pack(fill=X)
+
+        io_frame = tb.Frame(search_frame)
+        io_frame.pack(fill=X, pady=(10, 0))
+        tb.Button(io_frame, text="Import Folder", bootstyle="link", command=lambda: self.import_dialog(folder=True)).pack(side=LEFT)
+        tb.Button(io_frame, text="Import Files", bootstyle="link", command=self.import_dialog).pack(side=LEFT)
+        tb.Button(io_frame, text="Export", bootstyle="link", command=self.export_dialog).pack(side=RIGHT)
+        self.io_status = tb.Label(search_frame, text="", font=("Segoe UI", 9), foreground="#65676b")
+        self.index_status = tb.Label(search_frame, text="", font=("Segoe UI", 9), foreground="#65676b")
+        self.io_progress = tb.Progressbar(search_frame, mode="indeterminate", bootstyle=PRIMARY)
 
         entries_list_container = tb.Frame(self.hist_content)
         entries_list_container.pack(fill=BOTH, expand=YES)
         self.history_list_canvas = Canvas(entries_list_container, bg="#ffffff", highlightthickness=0)
-        self.list_scroll = tb.Scrollbar(entries_list_container, orient=VERTICAL, command=self.history_list_canvas.yview)
-        self.history_list_frame = tb.Frame(self.history_list_canvas, bootstyle=LIGHT)
-        self.history_list_frame.bind("<Configure>", lambda e: self.history_list_canvas.configure(scrollregion=self.history_list_canvas.bbox("all")))
-        self.history_list_canvas.create_window((0, 0), window=self.history_list_frame, anchor="nw")
-        self.history_list_canvas.configure(yscrollcommand=self.list_scroll.set)
+        self.list_scroll = tb.Scrollbar(entries_list_container, orient=VERTICAL)
+        self.history_list = VirtualHistoryList(self.history_list_canvas, self.list_scroll, self.load_entry)
         self.history_list_canvas.pack(side=LEFT, fill=BOTH, expand=YES); self.list_scroll.pack(side=RIGHT, fill=Y)
 
         self.display_entries()
 
+    # STARTUP
+    # ------------------------------------------------------------------
+    def on_first_map(self, event):
+        self.text_area.unbind("<Map>")
+        self.root.after_idle(self.on_first_paint)
+
+    def on_first_paint(self):
+        # Idle after the editor is mapped: it has been drawn and takes keystrokes
+        self.startup_times["first_paint_ms"] = round((time.perf_counter() - STARTED) * 1000, 1)
+        self.root.after(1, self.finish_startup)
+
+    def finish_startup(self):
+        self.load_entries()
+        self.get_live_weather(self.current_city, self.on_weather_result)
+        self.scheduler.animate("quote", self.animate_quote)
+
+    def on_archive_read(self, archive):
+        self.model.install(archive)
+        self.archive_ready = True
+        self.build_library()
+        self.save_btn.config(state=NORMAL)
+        self.startup_times["library_ms"] = round((time.perf_counter() - STARTED) * 1000, 1)
+        self.startup_times["entries"] = len(self.model)
+        if self.report_startup: print(json.dumps(self.startup_times), flush=True)
+        self.root.after(500, self.index_bodies_step)
+
+    def on_archive_failed(self, error):
+        # Saving stays disabled so nothing is written over an archive that couldn't be read;
+        # the draft autosave keeps what is typed in the editor
+        self.build_library_card()
+        tb.Label(self.hist_content, text=f"The journal archive could not be opened, so saving is off:\n{error}",
+                 font=("Segoe UI", 10), bootstyle=DANGER, wraplength=260, justify=LEFT).pack(anchor=W, fill=X)
+
+    def load_snapshot(self):
+        """City and atmosphere the last session ended with, so the first frame needs no lookup"""
+        try:
+            with open(self.snapshot_path, "r") as f: snap = json.load(f)
+            self.current_city = snap["city"]
+            reading = snap["temp"], snap["condition"], snap["humidity"]
+        except (OSError, ValueError, KeyError):
+            reading = self.weather.last_known(self.current_city)
+        if reading: self.live_temp, self.live_condition, self.live_humidity = reading
+
+    def save_snapshot(self, reading):
+        if reading[0] in ("Offline", "N/A"): return  # keep painting the last real reading
+        temp, condition, humidity = reading
+        tmp = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp, "w") as f: json.dump({"city": self.current_city, "temp": temp, "condition": condition, "humidity": humidity}, f)
+            os.replace(tmp, self.snapshot_path)
+        except OSError:
+            pass
+
     
     # SAFE RENDERING METHODS (NoneType Protected)
     # ------------------------------------------------------------------
+    def schedule_redraw(self, draw):
+        """Coalesces <Configure> storms and atmosphere changes: each canvas is drawn at most once per frame"""
+        self.scheduler.invalidate(draw, lambda: draw(None))
+
     def draw_header_gradient(self, event):
         w = event.width if event else self.header_canvas.winfo_width()
         h = event.height if event else self.header_canvas.winfo_height()
@@ -247,33 +346,33 @@ class AtmosphericJournal:
         style = self.atmosphere_map.get(self.live_condition, self.atmosphere_map["Clear"])
         self.header_canvas.delete("header_ui")
         c1, c2 = style["header"][0], style["header"][1]
-        for i in range(h):
-            ratio = i / h
-            r = int(int(c1[1:3], 16) + (int(c2[1:3], 16) - int(c1[1:3], 16)) * ratio)
-            g = int(int(c1[3:5], 16) + (int(c2[3:5], 16) - int(c1[3:5], 16)) * ratio)
-            b = int(int(c1[5:7], 16) + (int(c2[5:7], 16) - int(c1[5:7], 16)) * ratio)
-            self.header_canvas.create_line(0, i, w, i, fill=f"#{r:02x}{g:02x}{b:02x}", tags="header_ui")
+        gradient = self.render_cache.gradient(c1, c2, w, h)
+        self.header_canvas.create_image(0, 0, image=gradient, anchor=NW, tags="header_ui")
         
         self.header_canvas.create_text(50, h/2 - 10, text="Atmospheric Journal", font=("Segoe UI", 34, "bold"), fill="#ffffff", anchor=W, tags="header_ui")
         self.header_canvas.create_text(50, h/2 + 30, text=f"Environmental Snapshot: {self.live_condition} in {self.current_city}", font=("Segoe UI", 12), fill="#ffffff", anchor=W, tags="header_ui")
         
         qx, qy, qw, qh = w - 470, h/2 - 35, 420, 70
-        self.create_rounded_rect(self.header_canvas, qx, qy, qx+qw, qy+qh, radius=15, fill="#ffffff", outline="", tags="header_ui")
-        self.quote_text_id = self.header_canvas.create_text(qx + qw/2, qy + qh/2, text="", font=("Segoe UI", 11, "italic"), fill="#1c1e21", width=qw-40, tags="header_ui")
+        quote_card = self.render_cache.card(qw, qh, 15, "#ffffff")
+        self.header_canvas.create_image(qx, qy, image=quote_card, anchor=NW, tags="header_ui")
+        self.header_canvas._imgs = (gradient, quote_card)  # on screen images must outlive LRU eviction
+        self.quote_text_id = self.header_canvas.create_text(qx + qw/2, qy + qh/2, text=self.quote_text, font=("Segoe UI", 11, "italic"), fill="#1c1e21", width=qw-40, tags="header_ui")
 
     def draw_title_card(self, event):
         w = event.width if event else self.title_canvas.winfo_width()
         h = event.height if event else self.title_canvas.winfo_height()
         if w < 20: w = 1000
+        if h < 20: h = 80
         self.title_canvas.delete("all")
-        self.create_rounded_rect(self.title_canvas, 5, 5, w-5, h-5, radius=15, fill="#ffffff", outline="#e0e4e8", width=1)
+        self.draw_card(self.title_canvas, w, h, radius=15, fill="#ffffff", outline="#e0e4e8", width=1)
 
     def draw_toolbar_card(self, event):
         w = event.width if event else self.toolbar_canvas.winfo_width()
         h = event.height if event else self.toolbar_canvas.winfo_height()
         if w < 20: w = 1000
+        if h < 20: h = 90
         self.toolbar_canvas.delete("all")
-        self.create_rounded_rect(self.toolbar_canvas, 5, 5, w-5, h-5, radius=15, fill="#ffffff", outline="#e0e4e8", width=1)
+        self.draw_card(self.toolbar_canvas, w, h, radius=15, fill="#ffffff", outline="#e0e4e8", width=1)
 
     def draw_editor_bg(self, event):
         w = event.width if event else self.editor_bg_canvas.winfo_width()
@@ -282,7 +381,7 @@ class AtmosphericJournal:
         if h < 20: h = 600
         style = self.atmosphere_map.get(self.live_condition, self.atmosphere_map["Clear"])
         self.editor_bg_canvas.delete("all")
-        self.create_rounded_rect(self.editor_bg_canvas, 5, 5, w-5, h-5, radius=25, fill=style["bg"], outline="#e0e4e8", width=1)
+        self.draw_card(self.editor_bg_canvas, w, h, radius=25, fill=style["bg"], outline="#e0e4e8", width=1)
         self.editor_bg_canvas.create_text(w/2, 40, text=datetime.now().strftime("%A, %B %d, %Y"), font=("Segoe UI", 12, "bold"), fill=style["accent"])
 
     def draw_history_bg(self, event):
@@ -292,43 +391,66 @@ class AtmosphericJournal:
         if h < 20: h = 800
         style = self.atmosphere_map.get(self.live_condition, self.atmosphere_map["Clear"])
         self.hist_bg_canvas.delete("all")
-        self.create_rounded_rect(self.hist_bg_canvas, 5, 5, w-5, h-5, radius=25, fill="#ffffff", outline=style["accent"], width=2)
+        self.draw_card(self.hist_bg_canvas, w, h, radius=25, fill="#ffffff", outline=style["accent"], width=2)
 
-    def create_rounded_rect(self, canvas, x1, y1, x2, y2, radius=25, **kwargs):
-        points = [x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y2-radius, x2, y2, x2-radius, y2, x1+radius, y2, x1, y2, x1, y2-radius, x1, y1+radius, x1, y1]
-        return canvas.create_polygon(points, **kwargs, smooth=True)
+    def draw_card(self, canvas, w, h, **style):
+        # One cached image item, inset 5px like the old polygon cards
+        canvas._img = self.render_cache.card(w - 10, h - 10, **style)  # keeps it alive if the LRU evicts it
+        return canvas.create_image(5, 5, image=canvas._img, anchor=NW)
 
     
     # LOGIC & DATA
     # ------------------------------------------------------------------
     def animate_quote(self):
-        if not self.quote_text_id: return
+        """One typing/erasing step, run by the frame scheduler. Returns ms until the next step"""
+        if not self.quote_text_id: return 500
         if self.typing_forward:
             if self.quote_index < len(self.current_quote):
-                disp = self.current_quote[:self.quote_index + 1]
-                self.header_canvas.itemconfig(self.quote_text_id, text=f"\"{disp}\"")
-                self.quote_index += 1; self.root.after(80, self.animate_quote)
-            else: self.root.after(3000, self.start_erasing)
-        else:
-            if self.quote_index > 0:
-                disp = self.current_quote[:self.quote_index - 1]
-                self.header_canvas.itemconfig(self.quote_text_id, text=f"\"{disp}\"")
-                self.quote_index -= 1; self.root.after(50, self.animate_quote)
-            else: self.typing_forward = True; self.current_quote = random.choice(self.quotes); self.root.after(500, self.animate_quote)
-
-    def start_erasing(self): self.typing_forward = False; self.animate_quote()
-
-    def update_char_count(self, event=None):
-        content = self.text_area.get("1.0", END).strip()
-        words = len(content.split()) if content else 0
-        self.char_count_label.config(text=f"{words} words | {len(content)} chars")
+                self.quote_index += 1; self.show_quote(self.current_quote[:self.quote_index])
+                return 80
+            self.typing_forward = False; return 3000
+        if self.quote_index > 0:
+            self.quote_index -= 1; self.show_quote(self.current_quote[:self.quote_index])
+            return 50
+        self.typing_forward = True; self.current_quote = random.choice(self.quotes)
+        return 500
+
+    def show_quote(self, disp):
+        self.quote_text = f"\"{disp}\""
+        self.header_canvas.itemconfig(self.quote_text_id, text=self.quote_text)
+
+    def update_char_count(self, words, chars):
+        # Called by TextStats whenever an edit changes the counts
+        self.char_count_label.config(text=f"{words} words | {chars} chars")
 
     def show_font_menu(self):
-        menu = tb.Toplevel(self.root); menu.title("Typography"); menu.geometry("300x400")
-        for f in ["Segoe UI", "Georgia", "Arial"]:
-            tb.Button(menu, text=f, bootstyle="outline-primary", command=lambda fn=f: self.update_font(fn, menu)).pack(fill=X, padx=20, pady=5)
-
-    def update_font(self, n, w): self.current_font_family = n; self.text_area.config(font=(n, self.current_font_size)); w.destroy()
+        # Built on first use, then hidden and shown again
+        if self.font_menu is None:
+            menu = self.font_menu = tb.Toplevel(self.root); menu.title("Typography"); menu.geometry("300x400")
+            menu.protocol("WM_DELETE_WINDOW", menu.withdraw)
+            for f in ["Segoe UI", "Georgia", "Arial"]:
+                tb.Button(menu, text=f, bootstyle="outline-primary", command=lambda fn=f: self.update_font(fn, menu)).pack(fill=X, padx=20, pady=5)
+        self.font_menu.deiconify(); self.font_menu.lift()
+
+    def show_insights(self):
+        s = self.model.analytics.summary()
+        lines = [f"{s['entries']} entries | {s['words']} words", ""]
+        streaks = s["streaks"]
+        lines.append(f"Writing streak: {streaks['current']} days (longest {streaks['longest']}, {streaks['days_written']} days written)")
+        tl = s["temp_vs_length"]
+        r = "n/a" if tl["r"] is None else f"{tl['r']:+.2f}"
+        lines += ["", f"Temperature vs. entry length: r = {r} over {tl['samples']} entries"]
+        lines += [f"  {lo:>4}..{hi:<4}°C  {n:>6} entries  {mean:8.0f} words avg" for lo, hi, n, mean in tl["bands"]]
+        for heading, rows in (("By weather", s["by_weather"]), ("By city", s["by_city"]), ("By month", s["by_month"][-24:])):
+            lines += ["", heading]
+            lines += [f"  {name[:24]:<24} {n:>6} entries  {words:>9} words" for name, n, words in rows]
+
+        win = tb.Toplevel(self.root); win.title("Atmosphere Insights"); win.geometry("620x700")
+        text = tb.Text(win, font=("Consolas", 10), wrap=NONE, padx=20, pady=20, borderwidth=0)
+        text.pack(fill=BOTH, expand=YES)
+        text.insert("1.0", "\n".join(lines)); text.config(state=DISABLED)
+
+    def update_font(self, n, w): self.current_font_family = n; self.text_area.config(font=(n, self.current_font_size)); w.withdraw()
     
     def toggle_bold(self):
         try:
@@ -338,43 +460,176 @@ class AtmosphericJournal:
             self.text_area.tag_configure("bold", font=(self.current_font_family, self.current_font_size, "bold"))
         except: pass
 
-    def new_entry(self): self.text_area.delete("1.0", END); self.title_var.set("Untitled Entry"); self.update_char_count()
+    def new_entry(self):
+        if self.confirm_discard(): self.clear_editor()
+
+    def clear_editor(self):
+        with self.drafts.paused(): self.text_area.delete("1.0", END); self.title_var.set("Untitled Entry")
+        self.drafts.reset()
 
     def save_entry(self):
+        if not self.archive_ready: return  # store not open yet (the button stays disabled until it is)
         content = self.text_area.get("1.0", END).strip()
         if not content: return
         entry = {"title": self.title_var.get(), "date": datetime.now().isoformat(), "content": content, "city": self.current_city, "weather": self.live_condition, "temp": self.live_temp}
-        self.entries.insert(0, entry); self.save_to_json(); self.display_entries(); self.new_entry()
+        self.model.save(entry); self.run_search(); self.clear_editor()
 
     def display_entries(self, data=None):
-        for w in self.history_list_frame.winfo_children(): w.destroy()
-        source = data if data is not None else self.entries
-        for e in source:
-            card = tb.Frame(self.history_list_frame, bootstyle=SECONDARY, padding=1); card.pack(fill=X, padx=10)
-            inner = tb.Frame(card, bootstyle=LIGHT, padding=15); inner.pack(fill=X)
-            tb.Label(inner, text=e['title'], font=("Segoe UI", 12, "bold")).pack(anchor=W)
-            badge = f"{e.get('date', '')[:10]} | {e.get('weather', 'Clear')}"
-            tb.Label(inner, text=badge, font=("Segoe UI", 9), foreground="#65676b").pack(anchor=W)
-            tb.Button(inner, text="Open", bootstyle="link", command=lambda obj=e: self.load_entry(obj)).pack(side=LEFT)
+        # Cards are recycled by the virtual list, only the data binding changes
+        self.history_list.set_data(data if data is not None else self.model.query("", self.sort_var.get()))
 
     def load_entry(self, e):
-        self.title_var.set(e['title']); self.text_area.delete("1.0", END); self.text_area.insert("1.0", e['content'])
+        if not self.confirm_discard(): return
+        content = self.model.get_content(e['id'])
+        with self.drafts.paused(): self.title_var.set(e['title']); self.text_area.delete("1.0", END); self.text_area.insert("1.0", content)
+        self.drafts.reset(e['title'], content)
         self.live_condition = e.get('weather', 'Clear')
         self.apply_contextual_atmosphere()
 
     def filter_entries(self, *args):
-        q = self.search_var.get().lower()
-        res = [e for e in self.entries if q in e['title'].lower()]
-        self.display_entries(res)
+        # Debounced: a burst of keystrokes runs a single query
+        if self.search_job: self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(150, self.run_search)
+
+    def run_search(self):
+        self.search_job = None
+        if self.history_list is None: return  # Library not built yet, build_library fills it
+        self.display_entries(self.model.query(self.search_var.get(), self.sort_var.get()))
+
+    # IMPORT / EXPORT
+    # ------------------------------------------------------------------
+    def import_dialog(self, folder=False):
+        from tkinter import filedialog
+        from journal_io import iter_import_batches
+        if folder:
+            d = filedialog.askdirectory(title="Import notes folder")
+            paths = [d] if d else []
+        else:
+            paths = list(filedialog.askopenfilenames(title="Import notes or journal dumps", filetypes=[("Notes & journals", "*.md *.markdown *.txt *.json *.jsonl"), ("All files", "*.*")]))
+        if not paths: return
+        def job(q):
+            # Search indexing happens here, so the Tk thread only writes the store and sorted lists
+            try:
+                for batch in iter_import_batches(paths): q.put(self.model.prepare_batch(batch))
+            finally:
+                self.model.search_index.release()
+        self.run_io_job(job, "Imported", import_batches=True)
+
+    def export_dialog(self):
+        from tkinter import filedialog
+        from journal_io import export_entries
+        dest = filedialog.asksaveasfilename(title="Export archive", defaultextension=".jsonl", filetypes=[("JSON lines", "*.jsonl"), ("JSON", "*.json")])
+        if not dest: return
+        fmt = "json" if dest.lower().endswith(".json") else "jsonl"
+        def job(q):
+            def counted(entries):
+                for i, e in enumerate(entries, 1):
+                    if i % 500 == 0: q.put(500)
+                    yield e
+            q.put(export_entries(counted(self.model.store.iter_entries()), dest, fmt) % 500)
+        self.run_io_job(job, "Exported")
+
+    def run_io_job(self, job, verb, import_batches=False):
+        """Runs job(queue) on a worker thread; batches/progress come back through the queue to the Tk thread"""
+        q = queue.Queue(maxsize=4)  # bounded, so the parser never runs far ahead of the writer
+        def worker():
+            try: job(q)
+            except Exception as e: q.put(e)
+            q.put(None)
+        threading.Thread(target=worker, name="journal-io", daemon=True).start()
+        self.io_status.config(text=f"{verb} 0 entries"); self.io_status.pack(fill=X, pady=(5, 0))
+        self.io_progress.pack(fill=X, pady=(5, 0)); self.io_progress.start(15)
+        self.root.after(50, self.drain_io_job, q, verb, import_batches, 0)
+
+    def drain_io_job(self, q, verb, import_batches, count):
+        try: item = q.get_nowait()
+        except queue.Empty: self.root.after(50, self.drain_io_job, q, verb, import_batches, count); return
+
+        if item is None or isinstance(item, Exception):
+            self.io_progress.stop(); self.io_progress.pack_forget()
+            self.io_status.config(text=f"{verb} {count} entries" if item is None else f"{verb} {count} entries, then failed: {item}")
+            if import_batches: self.run_search()
+            return
+        if import_batches:
+            self.model.save_many(item, indexed=True); count += len(item)
+        else:
+            count += item
+        self.io_status.config(text=f"{verb} {count} entries")
+        # One batch per tick keeps the window responsive during big imports
+        self.root.after(1, self.drain_io_job, q, verb, import_batches, count)
 
-    def save_to_json(self):
-        with open("context_journal_final.json", "w") as f: json.dump(self.entries, f, indent=4)
+    # DRAFT AUTOSAVE
+    # ------------------------------------------------------------------
+    def restore_draft(self):
+        # Bring back whatever was being written when the app last closed or crashed
+        self.drafts.restore(self.text_area, self.title_var)
+        self.text_stats.add_listener(self.drafts.on_edit)
+        self.title_var.trace_add("write", lambda *a: self.drafts.on_title(self.title_var.get()))
+        self.drafts.on_checkpoint_due = lambda: self.root.after_idle(self.checkpoint_draft)
+
+    def checkpoint_draft(self):
+        self.drafts.checkpoint(self.title_var.get(), self.text_area.get("1.0", "end-1c"))
+
+    def confirm_discard(self):
+        if not self.drafts.dirty: return True
+        from ttkbootstrap.dialogs import Messagebox
+        answer = Messagebox.show_question("Discard the unsaved changes in the editor?", "Unsaved Draft", parent=self.root, buttons=["Keep Editing:secondary", "Discard:danger"])
+        return answer == "Discard"
 
     def load_entries(self):
-        if os.path.exists("context_journal_final.json"):
-            with open("context_journal_final.json", "r") as f: self.entries = json.load(f)
+        # Metadata is read and indexed on a worker so the editor keeps taking keystrokes;
+        # bodies stay on disk until an entry is opened
+        q = queue.Queue(maxsize=1)
+        def worker():
+            try: q.put(self.model.read_archive())
+            except Exception as e: q.put(e)
+        threading.Thread(target=worker, name="archive-read", daemon=True).start()
+        def poll():
+            try: result = q.get_nowait()
+            except queue.Empty: self.root.after(20, poll); return
+            if isinstance(result, Exception): self.on_archive_failed(result)
+            else: self.on_archive_read(result)
+        poll()
+
+    def index_bodies_step(self):
+        # Bodies are indexed on a worker thread; this only reports progress and applies word counts
+        if self.model.index_bodies():
+            self.index_status.config(text=f"Indexing entry text for search: {self.model.bodies_left} left")
+            self.index_status.pack(fill=X, pady=(5, 0))
+            self.root.after(250, self.index_bodies_step)
+        else:
+            self.index_status.pack_forget()
+
+    def on_close(self):
+        self.drafts.close()
+        self.model.close()
+        self.weather.close()
+        self.root.destroy()
+
+PROFILED_METHODS = [
+    "finish_startup", "on_archive_read", "build_library", "apply_contextual_atmosphere", "render_atmosphere", "display_entries", "run_search", "animate_quote",
+    "draw_header_gradient", "draw_title_card", "draw_toolbar_card", "draw_editor_bg", "draw_history_bg",
+]
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atmospheric Journal")
+    parser.add_argument("--profile", action="store_true", default=os.environ.get("ATMOS_PROFILE") == "1", help="time Tk callbacks and redraws into a ring buffer")
+    parser.add_argument("--profile-overlay", action="store_true", help="show live frame times and slowest callbacks (implies --profile)")
+    parser.add_argument("--trace-out", default="atmos_trace.json", help="Chrome-trace JSON written on exit when profiling")
+    parser.add_argument("--startup-report", action="store_true", help="print time to first paint and to a filled Library as JSON")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile or args.profile_overlay:
+        from profiler import Profiler, ProfilerOverlay
+        profiler = Profiler()
+        profiler.install()
+        profiler.instrument(AtmosphericJournal, PROFILED_METHODS)
+        atexit.register(lambda: print(f"Trace written to {profiler.export_chrome_trace(args.trace_out)}"))
+
     app_window = tb.Window(themename="cosmo")
-    app = AtmosphericJournal(app_window)
+    app = AtmosphericJournal(app_window, report_startup=args.startup_report)
+    if profiler:
+        profiler.watch_frames(app_window)
+        if args.profile_overlay: ProfilerOverlay(app_window, profiler)
     app_window.mainloop()
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+import tkinter
+from collections import deque
+
+
+# HOT-PATH PROFILER (OPT-IN)
+# ------------------------------------------------------------------
+# Nothing here is touched unless profiling is switched on (--profile or
+# ATMOS_PROFILE=1). When it is, every Tk callback and `after` handler, plus
+# chosen methods such as the canvas redraws, are timed into a ring buffer.
+# The buffer can be exported as a Chrome trace (chrome://tracing, Perfetto),
+# and an optional overlay shows frame times and the slowest callbacks live.
+
+FRAME_MS = 16
+
+
+class Profiler:
+    def __init__(self, capacity=50000):
+        self.events = deque(maxlen=capacity)
+        self.frames = deque(maxlen=capacity // 10)
+        self.t0 = time.perf_counter()
+        self.pid = os.getpid()
+        self._orig_register = None
+        self._orig_after = None
+
+    # RECORDING
+    # ------------------------------------------------------------------
+    def wrap(self, fn, name=None, cat="callback"):
+        name = name or getattr(fn, "__qualname__", None) or repr(fn)
+        events, clock = self.events, time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                events.append((name, cat, start, clock(), threading.get_ident()))
+        timed.__wrapped__ = fn
+        timed.__qualname__ = name
+        return timed
+
+    def instrument(self, cls, names, cat="method"):
+        """Wraps methods on the class so every caller, including __init__, is timed"""
+        for n in names:
+            setattr(cls, n, self.wrap(getattr(cls, n), f"{cls.__name__}.{n}", cat))
+
+    def install(self):
+        """Times every Tk callback and after/after_idle handler"""
+        profiler = self
+        self._orig_register = orig_register = tkinter.Misc._register
+        self._orig_after = orig_after = tkinter.Misc.after
+
+        def _register(widget, func, subst=None, needcleanup=1):
+            # after() registers its own `callit` shim; the handler itself is wrapped below
+            if not getattr(func, "__qualname__", "").endswith(".callit"):
+                func = profiler.wrap(func)
+            return orig_register(widget, func, subst, needcleanup)
+
+        def after(widget, ms, func=None, *args):
+            if func is not None: func = profiler.wrap(func, cat="after")
+            return orig_after(widget, ms, func, *args)
+
+        tkinter.Misc._register = _register
+        tkinter.Misc.after = after
+
+    def watch_frames(self, root):
+        """Heartbeat on the untimed `after` that measures how late each frame ran"""
+        clock, after = time.perf_counter, self._orig_after or tkinter.Misc.after
+        last = [clock()]
+
+        def beat():
+            now = clock()
+            self.frames.append((now, now - last[0]))
+            last[0] = now
+            after(root, FRAME_MS, beat)
+        after(root, FRAME_MS, beat)
+
+    # REPORTING
+    # ------------------------------------------------------------------
+    def slowest(self, n=5, window=None):
+        """[(name, max_ms, total_ms, calls)] over the last `window` events"""
+        stats = {}
+        events = list(self.events)[-window:] if window else list(self.events)
+        for name, cat, start, end, tid in events:
+            d = (end - start) * 1000
+            s = stats.setdefault(name, [0.0, 0.0, 0])
+            s[0] = max(s[0], d); s[1] += d; s[2] += 1
+        return sorted(((k, *v) for k, v in stats.items()), key=lambda r: -r[1])[:n]
+
+    def frame_stats(self, seconds=2.0):
+        cutoff = time.perf_counter() - seconds
+        recent = [dt * 1000 for t, dt in list(self.frames) if t >= cutoff]
+        if not recent: return None
+        return {"avg_ms": sum(recent) / len(recent), "max_ms": max(recent), "fps": len(recent) / seconds}
+
+    def export_chrome_trace(self, path):
+        to_us = lambda t: round((t - self.t0) * 1e6, 1)
+        trace = [{"name": name, "cat": cat, "ph": "X", "ts": to_us(start), "dur": round((end - start) * 1e6, 1),
+                  "pid": self.pid, "tid": tid} for name, cat, start, end, tid in list(self.events)]
+        trace += [{"name": "frame_ms", "ph": "C", "ts": to_us(t), "pid": self.pid, "args": {"frame_ms": round(dt * 1000, 2)}}
+                  for t, dt in list(self.frames)]
+        with open(path, "w") as f: json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+class ProfilerOverlay:
+    """Small always-on-top window with live frame times and the slowest callbacks"""
+    def __init__(self, root, profiler, refresh_ms=500):
+        self.profiler = profiler
+        self.refresh_ms = refresh_ms
+        self.after = profiler._orig_after or tkinter.Misc.after
+        self.win = tkinter.Toplevel(root)
+        self.win.title("Frame Budget")
+        self.win.attributes("-topmost", True)
+        self.label = tkinter.Label(self.win, font=("Consolas", 9), justify="left", anchor="nw", padx=10, pady=8)
+        self.label.pack(fill="both", expand=True)
+        self.after(self.win, refresh_ms, self.refresh)
+
+    def refresh(self):
+        if not self.win.winfo_exists(): return
+        frames = self.profiler.frame_stats()
+        lines = ["frame  --" if not frames else
+                 f"frame  avg {frames['avg_ms']:.1f} ms  max {frames['max_ms']:.1f} ms  {frames['fps']:.0f} fps"]
+        lines.append("")
+        lines.append("slowest (max / total ms, calls)")
+        for name, worst, total, calls in self.profiler.slowest(8, window=5000):
+            lines.append(f"{worst:7.1f} {total:8.1f} {calls:5d}  {name[-48:]}")
+        self.label.config(text="\n".join(lines))
+        self.after(self.win, self.refresh_ms, self.refresh)
@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from PIL import Image, ImageColor, ImageDraw, ImageTk
+
+
+# RENDER CACHE
+# ------------------------------------------------------------------
+# Gradients and rounded cards are rasterised once per (colours, width, height)
+# and shown as a single canvas image item. Recently used images are kept in
+# an LRU, so flipping back to a previous size or condition is free.
+# Eviction only drops the cache's reference: whoever draws an image keeps
+# its own reference for as long as the image is on screen.
+
+class RenderCache:
+    def __init__(self, master, maxsize=24):
+        self.master = master
+        self.maxsize = maxsize
+        self._images = OrderedDict()
+
+    def _get(self, key, build):
+        img = self._images.get(key)
+        if img is not None:
+            self._images.move_to_end(key)
+            return img
+        img = self._images[key] = ImageTk.PhotoImage(build(), master=self.master)
+        while len(self._images) > self.maxsize:
+            self._images.popitem(last=False)
+        return img
+
+    def gradient(self, c1, c2, w, h):
+        """Vertical c1 -> c2 gradient"""
+        def build():
+            top, bottom = ImageColor.getrgb(c1), ImageColor.getrgb(c2)
+            column = Image.new("RGB", (1, h))
+            column.putdata([tuple(int(a + (b - a) * i / h) for a, b in zip(top, bottom)) for i in range(h)])
+            return column.resize((w, h), Image.NEAREST)
+        return self._get(("gradient", c1, c2, w, h), build)
+
+    def card(self, w, h, radius, fill, outline="", width=0):
+        """Rounded card with transparent corners"""
+        def build():
+            img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+            ImageDraw.Draw(img).rounded_rectangle((0, 0, w - 1, h - 1), radius=radius, fill=fill, outline=outline or None, width=width)
+            return img
+        return self._get(("card", w, h, radius, fill, outline, width), build)
@@ -0,0 +1,273 @@
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from journal_store import META_FIELDS
+
+
+# FULL-TEXT SEARCH (SQLITE FTS5)
+# ------------------------------------------------------------------
+# Titles and entry text are indexed by SQLite FTS5 in a file next to the
+# journal log, so postings live on disk and memory only holds per-entry
+# bookkeeping: its FTS row, its weather/city filter keys and its age. The
+# FTS table is contentless (content=''), so entry text is not stored a second
+# time. Contentless rows can't be updated: re-indexing an entry writes a new
+# row and the old one is simply no longer mapped to it. The file starts over
+# once such rows outnumber live ones.
+#
+# Ranking: entries whose title matches more of the terms come first, ties
+# newest first. (bm25() costs about 20 ms on a broad query over 100k entries,
+# looking up title hits well under 1 ms.)
+# Terms shorter than MIN_PREFIX are not searched: a query of only those
+# returns None, meaning "no filter yet".
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MIN_PREFIX = 3
+ORPHANS_MIN = 500
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS text USING fts5(
+    title, content, content='', detail=column, prefix='3', tokenize="unicode61 tokenchars '_'");
+-- bare: the title of a row indexed without its text yet, so it can be deleted exactly
+CREATE TABLE IF NOT EXISTS docs(
+    row INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, sig TEXT NOT NULL, bare TEXT, words INTEGER);
+"""
+MATCH = "SELECT group_concat(rowid) FROM text WHERE text MATCH ?"
+DELETE_BARE = "INSERT INTO text(text, rowid, title, content) VALUES('delete', ?, ?, '')"
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def signature(meta):
+    """Fingerprint of the metadata an entry was indexed under: a mismatch at load means its text is stale"""
+    raw = "\x1f".join(str(meta.get(k, "")) for k in META_FIELDS)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def locked(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock: return method(self, *args, **kwargs)
+    return wrapper
+
+
+def parse_query(query):
+    """Splits 'weather:rain city:london walk' into terms and field filters"""
+    terms, filters = [], {}
+    for part in query.split():
+        field, sep, value = part.partition(":")
+        if sep and field.lower() in ("weather", "city") and value:
+            filters[field.lower()] = value.lower()
+        else:
+            terms.extend(tokenize(part))
+    return terms, filters
+
+
+class SearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conns = []
+        self._ready = False
+        self._rows = {}  # entry id -> FTS row
+        self._ids = []  # FTS row -> entry id; None for rows that were superseded
+        self._bare = set()  # ids whose row has only the title so far
+        self._doc_fields = {}
+        self._field_postings = {}  # ("weather" | "city", value) -> {entry ids}
+        self._doc_seq = {}
+        self._seq = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_seq)
+
+    # CONNECTIONS
+    # ------------------------------------------------------------------
+    def _db(self):
+        """This thread's connection. In WAL mode searches read while another thread writes"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA synchronous=NORMAL")  # no fsync per commit: anything lost is re-indexed at load
+            db.execute("PRAGMA wal_autocheckpoint=0")  # checkpoint() runs on the indexer thread instead
+            with self._lock:
+                if not self._ready:
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.executescript(SCHEMA)
+                    self._ready = True
+                self._conns.append(db)
+        return db
+
+    @contextmanager
+    def _writing(self):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try: yield db
+        except BaseException:
+            db.execute("ROLLBACK"); raise
+        db.execute("COMMIT")
+
+    def checkpoint(self):
+        """Folds the write-ahead log back into the index file. Keep it off the Tk thread"""
+        self._db().execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def release(self):
+        """Closes this thread's connection, for a worker thread that is done with the index"""
+        db = getattr(self._local, "db", None)
+        if db is None: return
+        self._local.db = None
+        with self._lock:
+            if db in self._conns: self._conns.remove(db)
+        db.close()
+
+    def close(self):
+        with self._lock: conns, self._conns = self._conns, []
+        for db in conns:
+            try: db.close()
+            except sqlite3.Error: pass
+
+    # LOADING
+    # ------------------------------------------------------------------
+    def load(self, entries):
+        """Matches the on-disk index against `entries` (metadata, newest first).
+        Fills in word counts the metadata lacks. Returns the ids whose title or text still has
+        to be indexed, newest first"""
+        db = self._db()
+        docs = {entry_id: (row, sig, bare, words) for row, entry_id, sig, bare, words in db.execute("SELECT row, id, sig, bare, words FROM docs")}
+        issued = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'docs'").fetchone()
+        if issued and issued[0] - len(docs) > max(ORPHANS_MIN, len(entries)):
+            self._reset(db)
+            docs = {}
+
+        stale, live = [], set()
+        with self._lock:
+            for e in reversed(entries):
+                self._add_meta(e["id"], e)
+                live.add(e["id"])
+                doc = docs.get(e["id"])
+                if doc and doc[1] == signature(e):
+                    self._map(e["id"], doc[0], bare=doc[2] is not None)
+                    # Index written before word counts were tracked: the text was counted when indexed
+                    if doc[3] is not None: e.setdefault("words", doc[3])
+                    if doc[2] is None: continue
+                stale.append(e["id"])
+
+        dead = [doc for entry_id, doc in docs.items() if entry_id not in live]
+        if dead:
+            with self._writing() as db:
+                for row, _, bare, _ in dead:
+                    if bare is not None: db.execute(DELETE_BARE, (row, bare))
+                    db.execute("DELETE FROM docs WHERE row = ?", (row,))
+        return stale[::-1]
+
+    def _reset(self, db):
+        """Starts the file over once rows left behind by re-indexing outnumber live ones"""
+        db.executescript("DROP TABLE text; DROP TABLE docs;")
+        db.execute("VACUUM")
+        db.executescript(SCHEMA)
+
+    # WRITES
+    # ------------------------------------------------------------------
+    def add(self, doc_id, entry):
+        """Indexes (or re-indexes) one full entry"""
+        self.add_meta(doc_id, entry)
+        self.add_text([dict(entry, id=doc_id)])
+
+    @locked
+    def add_meta(self, doc_id, meta):
+        """Filter keys and age of an entry; searches only return entries added here"""
+        self._add_meta(doc_id, meta)
+
+    def _add_meta(self, doc_id, meta):
+        for key in zip(("weather", "city"), self._doc_fields.pop(doc_id, ())):
+            ids = self._field_postings[key]
+            ids.discard(doc_id)
+            if not ids: del self._field_postings[key]
+        fields = self._doc_fields[doc_id] = (meta.get("weather", "").lower(), meta.get("city", "").lower())
+        for key in zip(("weather", "city"), fields):
+            self._field_postings.setdefault(key, set()).add(doc_id)
+        self._seq += 1
+        self._doc_seq[doc_id] = self._seq
+
+    def add_text(self, entries, fill=False):
+        """Indexes title and text of entries (dicts with an "id") in one transaction, from any thread.
+        An entry without "content" gets only its title indexed for now. With fill=True, entries
+        already indexed this far since load are skipped (the indexer never overwrites a newer save)"""
+        with self._writing() as db:
+            for e in entries:
+                content = e.get("content")
+                with self._lock:
+                    if fill and e["id"] in self._rows and (content is None or e["id"] not in self._bare): continue
+                title = e.get("title", "")
+                old = db.execute("SELECT row, bare FROM docs WHERE id = ?", (e["id"],)).fetchone()
+                bare = title if content is None else None
+                words = len(content.split()) if content is not None else None
+                if old and old[1] is not None:
+                    # Only its title is indexed: delete exactly that and reuse the row
+                    row = old[0]
+                    db.execute(DELETE_BARE, (row, old[1]))
+                    db.execute("UPDATE docs SET sig = ?, bare = ?, words = ? WHERE row = ?", (signature(e), bare, words, row))
+                else:
+                    if old: db.execute("DELETE FROM docs WHERE row = ?", (old[0],))
+                    row = db.execute("INSERT INTO docs(id, sig, bare, words) VALUES (?, ?, ?, ?)",
+                                     (e["id"], signature(e), bare, words)).lastrowid
+                db.execute("INSERT INTO text(rowid, title, content) VALUES (?, ?, ?)", (row, title, content or ""))
+                # Mapped before COMMIT, while this thread still holds the write lock, so a
+                # concurrent fill=True writer always sees it
+                with self._lock: self._map(e["id"], row, bare=bare is not None)
+
+    def _map(self, doc_id, row, bare=False):
+        old = self._rows.get(doc_id)
+        if old is not None: self._ids[old] = None
+        if row >= len(self._ids): self._ids.extend([None] * (row + 1 - len(self._ids)))
+        self._rows[doc_id] = row
+        self._ids[row] = doc_id
+        if bare: self._bare.add(doc_id)
+        else: self._bare.discard(doc_id)
+
+    # QUERIES
+    # ------------------------------------------------------------------
+    def _match(self, db, expr):
+        """FTS rows matching `expr`; one joined string is much cheaper to fetch than a row per hit"""
+        joined = db.execute(MATCH, (expr,)).fetchone()[0]
+        return list(map(int, joined.split(","))) if joined else []
+
+    def search(self, query, limit=None, ranked=True):
+        """Entry ids matching every term, or None if nothing is searchable yet.
+        Best match first when ranked, otherwise in no particular order"""
+        terms, filters = parse_query(query)
+        terms = [t for t in terms if len(t) >= MIN_PREFIX]
+        if not terms and not filters: return None
+
+        with self._lock:
+            allowed = None
+            if filters:
+                sets = sorted((self._field_postings.get(key, set()) for key in filters.items()), key=len)
+                allowed = sets[0].intersection(*sets[1:])
+            if not terms:
+                if not ranked: return list(allowed)
+                # Filter only: everything allowed scores the same, newest first
+                found = sorted(allowed, key=self._doc_seq.__getitem__, reverse=True)
+                return found[:limit] if limit else found
+
+        # Every term, as a prefix, in the title or the text
+        db = self._db()
+        rows = self._match(db, " ".join(f'"{t}"*' for t in terms))
+        titled = [self._match(db, f'title : "{t}"*') for t in terms] if ranked and rows else []
+
+        with self._lock:
+            ids, seq = self._ids, self._doc_seq
+            found = seq.keys() & {ids[r] for r in rows if r < len(ids)}
+            if allowed is not None: found &= allowed
+            if not ranked: return list(found)
+            title_hits = Counter(ids[r] for t in titled for r in t if r < len(ids))
+            found = sorted(found, key=seq.__getitem__, reverse=True)
+        # Title matches first, the more terms the better; the sort is stable so ties stay newest first
+        found = sorted((d for d in found if d in title_hits), key=title_hits.__getitem__, reverse=True) + \
+            [d for d in found if d not in title_hits]
+        return found[:limit] if limit else found
@@ -0,0 +1,125 @@
+import re
+from bisect import bisect_left, insort
+
+
+# SORTED LIBRARY INDEXES
+# ------------------------------------------------------------------
+# One sorted key list per sortable field, built once at load and kept in
+# order by bisect inserts on save. Sort modes are views over these lists,
+# so switching mode or filtering never re-sorts the archive.
+
+SORT_MODES = {
+    "Date (Newest)": ("date", True),
+    "Date (Oldest)": ("date", False),
+    "Title (A-Z)": ("title", False),
+    "Weather": ("weather", False),
+    "City": ("city", False),
+    "Temperature (Warmest)": ("temp", True),
+    "Temperature (Coldest)": ("temp", False),
+}
+RELEVANCE = "Best Match"
+TEMP_RE = re.compile(r"-?\d+(?:\.\d+)?")
+LABEL_GAP = 1 << 20
+
+
+def parse_temp(temp):
+    """'22°C' -> 22.0, None for readings like 'Offline' or 'N/A'"""
+    m = TEMP_RE.search(temp or "")
+    return float(m.group()) if m else None
+
+
+def sort_key(field, e):
+    if field == "temp":
+        t = parse_temp(e.get("temp"))
+        value = t if t is not None else float("-inf")
+    elif field == "date":
+        value = e.get("date", "")
+    else:
+        value = e.get(field, "").lower()
+    # Date breaks ties, the id keeps keys unique so removal can bisect to them
+    return (value, e.get("date", ""), e["id"])
+
+
+class EntryView:
+    """Read-only sequence of entries over a sorted key list"""
+    def __init__(self, keys, entries_by_id, reverse=False):
+        self.keys = keys
+        self.entries_by_id = entries_by_id
+        self.reverse = reverse
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, i):
+        key = self.keys[len(self.keys) - 1 - i] if self.reverse else self.keys[i]
+        return self.entries_by_id[key[-1]]
+
+
+class SortedIndexes:
+    FIELDS = ("date", "title", "weather", "city", "temp")
+
+    def __init__(self, entries=()):
+        self.indexes = {f: sorted(sort_key(f, e) for e in entries) for f in self.FIELDS}
+        # field -> {id: label}, labels increasing in key order with gaps between them, so
+        # an insert takes the midpoint of its neighbours instead of renumbering the field
+        self.labels = {}
+
+    def label(self, field):
+        labels = self.labels.get(field)
+        if labels is None:
+            labels = self.labels[field] = {k[-1]: i * LABEL_GAP for i, k in enumerate(self.indexes[field])}
+        return labels
+
+    def _insert(self, field, keys, key):
+        i = bisect_left(keys, key)
+        keys.insert(i, key)
+        labels = self.labels.get(field)
+        if labels is None: return
+        if i + 1 == len(keys):
+            labels[key[-1]] = labels[keys[i - 1][-1]] + LABEL_GAP if i else 0
+        elif i == 0:
+            labels[key[-1]] = labels[keys[1][-1]] - LABEL_GAP
+        else:
+            lo, hi = labels[keys[i - 1][-1]], labels[keys[i + 1][-1]]
+            if hi - lo > 1: labels[key[-1]] = (lo + hi) // 2
+            else: del self.labels[field]  # out of room here: renumbered on next use
+
+    def add(self, e):
+        for f, keys in self.indexes.items(): self._insert(f, keys, sort_key(f, e))
+
+    def add_many(self, entries):
+        for f, keys in self.indexes.items():
+            new = [sort_key(f, e) for e in entries]
+            if len(new) * 16 < len(keys):
+                # A small batch into a big index: bisecting each key in beats a pass over all of them
+                for key in new: self._insert(f, keys, key)
+            else:
+                # Appending one sorted run and re-sorting is a linear merge for Timsort
+                keys.extend(sorted(new))
+                keys.sort()
+                self.labels.pop(f, None)
+
+    def remove(self, e):
+        for f, keys in self.indexes.items():
+            key = sort_key(f, e)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+                if f in self.labels: del self.labels[f][key[-1]]
+
+    def view(self, mode, entries_by_id, subset=None):
+        """Entries in `mode` order, restricted to the ids in `subset` when given"""
+        field, reverse = SORT_MODES.get(mode, SORT_MODES["Date (Newest)"])
+        keys = self.indexes[field]
+        if subset is None:
+            return EntryView(keys, entries_by_id, reverse)
+
+        subset = set(subset)
+        if len(subset) * 6 < len(keys):
+            # Order just the matches, by their labels
+            ordered = sorted(subset, key=self.label(field).__getitem__, reverse=reverse)
+        else:
+            # Most of the archive matches: keep the keys that match, already in order
+            ordered = [k[-1] for k in keys if k[-1] in subset]
+            if reverse: ordered.reverse()
+        return [entries_by_id[i] for i in ordered]
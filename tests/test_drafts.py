@@ -0,0 +1,53 @@
+"""DraftJournal write-ahead log: capture, flush and replay into stand-ins for the Tk widgets."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drafts import DraftJournal
+
+
+class FakeText:
+    """Whole-text stand-in for a Tk Text widget: only "1.0"/"end" ranges are replayed here"""
+    def __init__(self): self.text = ""
+    def delete(self, a, b): self.text = ""
+    def insert(self, at, s): self.text += s
+
+
+class FakeVar:
+    def __init__(self, value="Untitled Entry"): self.value = value
+    def set(self, value): self.value = value
+
+
+@pytest.fixture
+def drafts(tmp_path):
+    journal = DraftJournal(str(tmp_path / "draft.log"), flush_interval=0)
+    yield journal
+    journal.close()
+
+
+def replay(journal):
+    journal.flush()
+    text, title = FakeText(), FakeVar()
+    assert journal.restore(text, title)
+    return title.value, text.text
+
+
+def test_reset_of_the_text_keeps_the_title(drafts):
+    drafts.on_title("Storm notes")
+    drafts.on_edit("reset", "All new text")
+    assert replay(drafts) == ("Storm notes", "All new text")
+
+
+def test_reset_keeps_the_title_of_an_opened_entry(drafts):
+    drafts.reset("Opened", "old text")
+    drafts.on_edit("reset", "pasted over")
+    assert replay(drafts) == ("Opened", "pasted over")
+
+
+def test_reset_of_a_new_entry_leaves_the_default_title(drafts):
+    drafts.reset()
+    drafts.on_edit("reset", "first words")
+    assert replay(drafts) == ("Untitled Entry", "first words")
@@ -0,0 +1,107 @@
+"""Import parsing: JSON dump shapes and mapping foreign records onto the entry schema."""
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import journal_io
+from journal_io import iter_dump, iter_json_values, iter_records, normalize
+
+
+def records(n):
+    return [{"title": f"Note {i}", "date": "2021-05-03T10:00:00", "content": f"text {i} " * 40} for i in range(n)]
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("shape", ["array", "lines", "wrapped", "nested"])
+def test_dump_shapes(tmp_path, shape):
+    notes = records(300)
+    text = {
+        "array": lambda: json.dumps(notes),
+        "lines": lambda: "".join(json.dumps(n) + "\n" for n in notes),
+        "wrapped": lambda: json.dumps({"version": 2, "title": "My Export", "entries": notes}),
+        "nested": lambda: json.dumps({"data": {"entries": notes}}),
+    }[shape]()
+    imported = list(iter_dump(write(tmp_path, "dump.json", text)))
+    assert [e["title"] for e in imported] == [n["title"] for n in notes]
+    assert imported[7]["content"] == notes[7]["content"]
+
+
+def test_journal_log_is_imported_with_its_ids(tmp_path):
+    log = '{"op":"put","id":"a1","entry":{"title":"Kept","content":"x"}}\n{"op":"del","id":"zz"}\n'
+    assert [(e["id"], e["title"]) for e in iter_dump(write(tmp_path, "old.log.jsonl", log))] == [("a1", "Kept")]
+
+
+def test_wrapped_dump_is_streamed(monkeypatch):
+    monkeypatch.setattr(journal_io, "READ_CHUNK", 1024)
+    notes = records(2000)
+    f = io.StringIO(json.dumps({"exported": "2024-01-01", "entries": notes}))
+    size = len(f.getvalue())
+
+    values = iter_json_values(f)
+    first = next(values)
+    # The first record arrives after a few chunks, not after reading the whole dump
+    assert first == notes[0] and f.tell() < 4 * 1024
+    assert list(values) == notes[1:]
+    assert f.tell() == size
+
+
+def test_wrapper_fields_are_not_taken_for_a_record(monkeypatch):
+    monkeypatch.setattr(journal_io, "READ_CHUNK", 16)
+    f = io.StringIO(json.dumps({"title": "Export", "count": 1, "entries": records(1)}))
+    assert [r["title"] for v in iter_json_values(f) for r in iter_records(v)] == ["Note 0"]
+
+
+def test_long_record_is_not_split(monkeypatch):
+    monkeypatch.setattr(journal_io, "READ_CHUNK", 16)
+    note = {"title": "Long", "content": "word " * 500, "tags": []}
+    f = io.StringIO(json.dumps(note))
+    assert [r for v in iter_json_values(f) for r in iter_records(v)] == [note]
+
+
+@pytest.mark.parametrize("chunk", [16, 1 << 16])
+def test_truncated_dump_raises(monkeypatch, chunk):
+    monkeypatch.setattr(journal_io, "READ_CHUNK", chunk)
+    f = io.StringIO(json.dumps({"entries": records(50)})[:-40])
+    with pytest.raises(ValueError):
+        list(iter_json_values(f))
+
+
+@pytest.mark.parametrize("raw, date", [
+    (1620036000, datetime.fromtimestamp(1620036000).isoformat()),
+    (1620036000123, datetime.fromtimestamp(1620036000.123).isoformat()),
+    ("1620036000", datetime.fromtimestamp(1620036000).isoformat()),
+    ("2021-05-03T10:00:00", "2021-05-03T10:00:00"),
+    ("2021-05-03", "2021-05-03T00:00:00"),
+    ("May 3, 2021", "2021-05-03T00:00:00"),
+    ("2021/05/03 10:30", "2021-05-03T10:30:00"),
+    ("03.05.2021", "2021-05-03T00:00:00"),
+])
+def test_dates_are_stored_as_local_iso(raw, date):
+    assert normalize({"title": "t", "date": raw})["date"] == date
+
+
+def test_utc_date_is_converted_to_local_time():
+    local = datetime(2021, 5, 3, 10, 0, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert normalize({"title": "t", "date": "2021-05-03T10:00:00Z"})["date"] == local.isoformat()
+
+
+@pytest.mark.parametrize("raw", [True, "next tuesday", "2021", 1e30, {"y": 2021}])
+def test_unreadable_date_falls_back(raw):
+    assert normalize({"title": "t", "date": raw}, fallback_date="2020-01-01T00:00:00")["date"] == "2020-01-01T00:00:00"
+
+
+def test_dump_dates_fall_back_to_the_file_mtime(tmp_path):
+    path = write(tmp_path, "dump.json", json.dumps([{"title": "t", "date": "someday"}]))
+    os.utime(path, (1620036000, 1620036000))
+    assert [e["date"] for e in iter_dump(path)] == [datetime.fromtimestamp(1620036000).isoformat()]
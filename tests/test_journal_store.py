@@ -0,0 +1,157 @@
+"""JournalStore crash recovery, legacy migration and compaction, on real files in a temp directory."""
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import journal_store
+from journal_store import JournalStore
+
+
+def entry(i, **kw):
+    return dict({"title": f"Entry {i}", "date": f"2024-01-{i % 28 + 1:02d}T09:00:00", "content": f"body {i} " * 20,
+                 "city": "London", "weather": "Rain", "temp": "11°C"}, **kw)
+
+
+@pytest.fixture
+def open_store(tmp_path):
+    stores = []
+    def make(**kw):
+        kw.setdefault("legacy_path", None)
+        stores.append(JournalStore(str(tmp_path / "journal.log"), **kw))
+        stores[-1].load()
+        return stores[-1]
+    yield make
+    for s in stores: s.close()
+
+
+def reopen(store, **kw):
+    store.close()
+    fresh = JournalStore(store.path, legacy_path=None, **kw)
+    return fresh, fresh.load()
+
+
+def test_entries_survive_a_reopen(open_store):
+    store = open_store()
+    ids = [store.put(entry(i))["id"] for i in range(5)]
+    store, metas = reopen(store)
+    assert [m["id"] for m in metas] == ids[::-1]
+    assert store.read_entry(ids[2])["content"] == entry(2)["content"]
+    store.close()
+
+
+def test_torn_tail_is_truncated(open_store):
+    store = open_store()
+    ids = [store.put(entry(i))["id"] for i in range(3)]
+    store.close()
+    size = os.path.getsize(store.path)
+    with open(store.path, "ab") as f: f.write(b'{"op":"put","id":"torn","entry":{"title":"half')
+
+    store, metas = reopen(store)
+    assert [m["id"] for m in metas] == ids[::-1]
+    assert os.path.getsize(store.path) == size
+    new_id = store.put(entry(9))["id"]
+    store, metas = reopen(store)
+    assert metas[0]["id"] == new_id and store.read_entry(new_id)["title"] == "Entry 9"
+    store.close()
+
+
+def test_index_ahead_of_log_is_rebuilt(open_store):
+    store = open_store()
+    ids = [store.put(entry(i))["id"] for i in range(3)]
+    store.close()
+    # The last log record never reached the disk, but its index line did
+    with open(store.path, "rb") as f: lines = f.readlines()
+    with open(store.path, "wb") as f: f.writelines(lines[:-1])
+
+    store, metas = reopen(store)
+    assert [m["id"] for m in metas] == ids[:2][::-1]
+    assert store.read_entry(ids[1])["content"] == entry(1)["content"]
+    store.close()
+    with open(store.index_path, "rb") as f: assert len(f.readlines()) == 2
+
+
+def test_missing_index_is_rebuilt_from_the_log(open_store):
+    store = open_store()
+    ids = [store.put(entry(i))["id"] for i in range(3)]
+    store.delete(ids[0])
+    store.close()
+    os.remove(store.index_path)
+
+    store, metas = reopen(store)
+    assert [m["id"] for m in metas] == [ids[2], ids[1]]
+    assert metas[0]["words"] == len(entry(2)["content"].split())
+    store.close()
+
+
+def test_legacy_archive_is_migrated(tmp_path):
+    legacy = tmp_path / "journal.json"
+    # The legacy file is newest first and has no ids
+    legacy.write_text(json.dumps([entry(2), entry(1), entry(0)]))
+    store = JournalStore(str(tmp_path / "journal.log"), legacy_path=str(legacy))
+    metas = store.load()
+    try:
+        assert [m["title"] for m in metas] == ["Entry 2", "Entry 1", "Entry 0"]
+        assert all(m["id"] for m in metas)
+        assert store.get_content(metas[1]["id"]) == entry(1)["content"]
+    finally:
+        store.close()
+
+    store, metas = reopen(store)
+    assert [m["title"] for m in metas] == ["Entry 2", "Entry 1", "Entry 0"]
+    store.close()
+
+
+def test_compaction_keeps_appends_made_while_it_runs(open_store):
+    store = open_store(compact_min_garbage=10 ** 9)  # compaction is started by hand below
+    ids = [store.put(entry(i))["id"] for i in range(200)]
+    for n in range(3):
+        for i, entry_id in enumerate(ids): store.put(entry(i, id=entry_id, title=f"Entry {i} v{n}"))
+
+    compactor = threading.Thread(target=store._compact)
+    compactor.start()
+    latest, n = {}, 0
+    while compactor.is_alive() or n < 50:
+        i = n % len(ids)
+        latest[ids[i]] = f"Entry {i} late {n}"
+        store.put(entry(i, id=ids[i], title=latest[ids[i]]))
+        n += 1
+    compactor.join()
+
+    expected = {entry_id: latest.get(entry_id, f"Entry {i} v2") for i, entry_id in enumerate(ids)}
+    assert {entry_id: store.read_entry(entry_id)["title"] for entry_id in ids} == expected
+    store, metas = reopen(store)
+    assert {m["id"]: m["title"] for m in metas} == expected
+    # Superseded records were dropped: without compaction there would be 4 * len(ids) + n
+    assert store._records <= len(ids) + n
+    store.close()
+
+
+def test_compaction_fsyncs_the_bulk_copy_without_the_lock(open_store, monkeypatch):
+    store = open_store(compact_min_garbage=10 ** 9)
+    ids = [store.put(entry(i))["id"] for i in range(50)]
+    for i, entry_id in enumerate(ids): store.put(entry(i, id=entry_id))
+
+    in_fsync, put_done = threading.Event(), threading.Event()
+    real_fsync = os.fsync
+    def slow_fsync(fd):
+        if threading.current_thread().name == "compactor" and not in_fsync.is_set():
+            in_fsync.set()
+            put_done.wait(5)  # a disk that takes a while to sync the whole copy
+        real_fsync(fd)
+    monkeypatch.setattr(journal_store.os, "fsync", slow_fsync)
+
+    compactor = threading.Thread(target=store._compact, name="compactor")
+    compactor.start()
+    assert in_fsync.wait(5)
+    writer = threading.Thread(target=lambda: (store.put(entry(99)), put_done.set()))
+    writer.start(); writer.join(2)
+    assert put_done.is_set(), "put() waited on the compaction fsync"
+    compactor.join()
+    store, metas = reopen(store)
+    assert len(metas) == 51
+    store.close()
@@ -0,0 +1,144 @@
+"""WeatherService against a local stub of the OpenWeatherMap current-weather endpoint."""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_service import WeatherService, OFFLINE
+
+
+READINGS = {
+    "london": {"cod": 200, "main": {"temp": 11.6, "humidity": 81}, "weather": [{"main": "Rain"}]},
+    "paris": {"cod": 200, "main": {"temp": 18.2, "humidity": 40}, "weather": [{"main": "Clear"}]},
+}
+
+
+class StubWeather:
+    def __init__(self):
+        self.hits = []
+        self.release = threading.Event()
+        self.release.set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                city = parse_qs(urlparse(self.path).query)["q"][0].lower()
+                stub.hits.append(city)
+                stub.release.wait(5)
+                body = json.dumps(READINGS.get(city, {"cod": "404", "message": "city not found"})).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/data/2.5/weather"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub():
+    s = StubWeather()
+    yield s
+    s.release.set()
+    s.server.shutdown(); s.server.server_close()
+
+
+@pytest.fixture
+def make_service(tmp_path, stub):
+    services = []
+    def make(**kw):
+        kw.setdefault("cache_path", str(tmp_path / "weather_cache.json"))
+        kw.setdefault("base_url", stub.url)
+        services.append(WeatherService("test-key", **kw))
+        return services[-1]
+    yield make
+    for s in services: s.close()
+
+
+def test_reading_is_parsed(make_service):
+    assert make_service().fetch("London").result(5) == ("12°C", "Rain", "81%")
+
+
+def test_fresh_reading_is_served_from_cache(make_service, stub):
+    service = make_service()
+    service.fetch("London").result(5)
+    assert service.fetch("london").result(5) == ("12°C", "Rain", "81%")
+    assert stub.hits == ["london"]
+
+
+def test_stale_reading_is_fetched_again(make_service, stub):
+    service = make_service(ttl=0)
+    service.fetch("London").result(5)
+    service.fetch("London").result(5)
+    assert stub.hits == ["london", "london"]
+
+
+def test_concurrent_lookups_share_one_request(make_service, stub):
+    service = make_service()
+    stub.release.clear()
+    first, second = service.fetch("London"), service.fetch("London")
+    assert first is second
+    stub.release.set()
+    assert first.result(5) == ("12°C", "Rain", "81%")
+    assert stub.hits == ["london"]
+
+
+def test_cache_persists_across_instances(make_service, stub):
+    make_service().fetch("London").result(5)
+    service = make_service()
+    assert service.last_known("London") == ("12°C", "Rain", "81%")
+    assert service.fetch("London").result(5) == ("12°C", "Rain", "81%")
+    assert stub.hits == ["london"]
+
+
+def test_concurrent_saves_leave_a_valid_cache(make_service, tmp_path):
+    service = make_service()
+    for f in [service.fetch("London"), service.fetch("Paris")]: f.result(5)
+    with open(tmp_path / "weather_cache.json") as f: cached = json.load(f)
+    assert set(cached) == {"london", "paris"}
+
+
+def test_unknown_city_is_not_cached(make_service, stub):
+    service = make_service()
+    assert service.fetch("Atlantis").result(5) == ("N/A", "Clear", "--")
+    assert service.last_known("Atlantis") is None
+    service.fetch("Atlantis").result(5)
+    assert stub.hits == ["atlantis", "atlantis"]
+
+
+def test_unreachable_server_reads_offline(make_service, stub):
+    stub.server.shutdown(); stub.server.server_close()
+    service = make_service()
+    assert service.fetch("London").result(10) == OFFLINE
+    assert service.last_known("London") is None
+
+
+def test_lookup_is_not_blocked_while_the_session_is_built(make_service, monkeypatch):
+    import requests
+    building, release = threading.Event(), threading.Event()
+    real_session = requests.Session
+    def slow_session():
+        building.set(); release.wait(5)  # a slow first import of requests
+        return real_session()
+    monkeypatch.setattr(requests, "Session", slow_session)
+
+    service = make_service()
+    first = service.fetch("London")
+    assert building.wait(5)
+    started = time.perf_counter()
+    second = service.fetch("Paris")
+    assert time.perf_counter() - started < 0.5
+    release.set()
+    assert first.result(5) == ("12°C", "Rain", "81%")
+    assert second.result(5) == ("18°C", "Clear", "40%")
@@ -0,0 +1,174 @@
+from tkinter import TclError
+
+
+# INCREMENTAL WORD / CHARACTER COUNTER
+# ------------------------------------------------------------------
+# The Text widget's Tcl command is wrapped so every insert/delete (typing,
+# paste, undo, programmatic edits) reports which lines it touched. Counts are
+# kept per line and only those lines are re-read. Edits spanning many lines
+# are re-counted in chunks from the idle loop so typing never waits on them.
+
+class TextStats:
+    IMMEDIATE_LINES = 64
+    CHUNK_LINES = 2000
+
+    def __init__(self, text, on_change):
+        self.text = text
+        self.on_change = on_change
+        self.line_words = [0]
+        self.line_chars = [0]
+        self.words = 0
+        self.chars = 0
+        self.dirty = []  # sorted, disjoint [start, end) ranges of 0-based line numbers
+        self.idle_job = None
+        self.listeners = []
+        self.pending = None  # bookkeeping for the edit Tk is about to make
+
+        # The widget command becomes a Tcl proc around the original. Tk's own errors
+        # (bad index, empty selection, nothing to undo) propagate natively, so Tcl
+        # `catch` in the bindings still sees them; Python only runs before and after
+        w = text._w
+        self.orig = w + "_stats_orig"
+        before, after = w + "_stats_before", w + "_stats_after"
+        text.tk.call("rename", w, self.orig)
+        text.tk.createcommand(before, self.before_edit)
+        text.tk.createcommand(after, self.after_edit)
+        text.tk.eval(
+            f"proc {w} args {{\n"
+            f"    if {{[lindex $args 0] ni {{insert delete replace}}}} {{ return [{self.orig} {{*}}$args] }}\n"
+            f"    {before} {{*}}$args\n"
+            f"    set result [{self.orig} {{*}}$args]\n"
+            f"    {after}\n"
+            f"    return $result\n"
+            f"}}")
+
+    # COMMAND INTERCEPTION
+    # ------------------------------------------------------------------
+    def call(self, *args):
+        return self.text.tk.call((self.orig,) + args)
+
+    def line_of(self, index):
+        # Tk never edits past the final newline, so clamp "end" onto the last line
+        last = int(self.call("index", "end-1c").split(".")[0])
+        return min(int(self.call("index", index).split(".")[0]), last) - 1
+
+    def add_listener(self, fn):
+        """fn(op, *args) gets every edit as ("insert", index, text), ("delete", start, end)
+        or ("reset", text), with indexes resolved to line.col as they were before the edit"""
+        self.listeners.append(fn)
+
+    def position(self, index):
+        idx, last = self.call("index", index), self.call("index", "end-1c")
+        return last if self.text.tk.getboolean(self.call("compare", idx, ">", last)) else idx
+
+    def describe(self, op, args):
+        if op == "insert" and len(args) >= 2:
+            return [("insert", self.position(args[0]), "".join(args[1::2]))]
+        if op in ("delete", "replace") and len(args) >= 1 and (op == "replace" or len(args) <= 2):
+            a = self.position(args[0])
+            b = self.position(args[1] if len(args) >= 2 else f"{args[0]}+1c")
+            edits = [("delete", a, b)] if self.text.tk.getboolean(self.call("compare", a, "<", b)) else []
+            if op == "replace": edits.append(("insert", a, "".join(args[2::2])))
+            return edits
+        return None
+
+    def plan(self, op, args):
+        """(start, old_n, new_n) lines the edit will replace, or None for a full recount"""
+        if op == "insert" and len(args) >= 2:
+            return self.line_of(args[0]), 1, sum(chunk.count("\n") for chunk in args[1::2]) + 1
+        if op == "delete" and 1 <= len(args) <= 2:
+            start = self.line_of(args[0])
+            end = self.line_of(args[1] if len(args) == 2 else f"{args[0]}+1c")
+            return start, max(end - start, 0) + 1, 1
+        if op == "replace" and len(args) >= 3:
+            start, end = self.line_of(args[0]), self.line_of(args[1])
+            return start, max(end - start, 0) + 1, sum(chunk.count("\n") for chunk in args[2::2]) + 1
+        # Multi-range deletes are rare; fall back to a full recount
+        return None
+
+    def before_edit(self, op, *args):
+        # Must never raise: a Python error here would resurface from mainloop
+        try:
+            edits = self.describe(op, args) if self.listeners else []
+            self.pending = (self.plan(op, args), edits)
+        except TclError:
+            self.pending = None  # bad index: Tk is about to report it, nothing changes
+
+    def after_edit(self):
+        pending, self.pending = self.pending, None
+        if pending is None: return
+        lines, edits = pending
+        try:
+            if lines: self.splice(*lines)
+            else: self.resync()
+            if edits is None: edits = [("reset", self.call("get", "1.0", "end-1c"))]
+        except TclError:
+            return
+        for edit in edits:
+            for fn in self.listeners: fn(*edit)
+
+    # LINE BOOKKEEPING
+    # ------------------------------------------------------------------
+    def splice(self, start, old_n, new_n):
+        """Lines [start, start+old_n) were replaced by new_n lines"""
+        stop = start + old_n
+        self.words -= sum(self.line_words[start:stop])
+        self.chars -= sum(self.line_chars[start:stop])
+        self.line_words[start:stop] = [0] * new_n
+        self.line_chars[start:stop] = [0] * new_n
+
+        delta = new_n - old_n
+        ranges = [(start, start + new_n)]
+        for a, b in self.dirty:
+            if b <= start: ranges.append((a, b))
+            elif a >= stop: ranges.append((a + delta, b + delta))
+            else:
+                if a < start: ranges.append((a, start))
+                if b > stop: ranges.append((start + new_n, b + delta))
+        self.dirty = self.merge(ranges)
+        self.process(self.IMMEDIATE_LINES)
+
+    def merge(self, ranges):
+        merged = []
+        for a, b in sorted(ranges):
+            if merged and a <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+            else:
+                merged.append((a, b))
+        return merged
+
+    def resync(self):
+        last = int(self.call("index", "end-1c").split(".")[0])
+        self.line_words, self.line_chars = [0] * last, [0] * last
+        self.words = self.chars = 0
+        self.dirty = [(0, last)]
+        self.process(self.IMMEDIATE_LINES)
+
+    def process(self, budget):
+        """Re-counts up to `budget` dirty lines now, leaving the rest to the idle loop"""
+        while self.dirty and budget > 0:
+            a, b = self.dirty[0]
+            stop = min(b, a + budget)
+            self.count_lines(a, stop)
+            budget -= stop - a
+            if stop == b: self.dirty.pop(0)
+            else: self.dirty[0] = (stop, b)
+
+        if self.dirty and not self.idle_job:
+            self.idle_job = self.text.after_idle(self.process_idle)
+        self.on_change(self.words, self.chars_total())
+
+    def process_idle(self):
+        self.idle_job = None
+        self.process(self.CHUNK_LINES)
+
+    def count_lines(self, a, b):
+        lines = self.call("get", f"{a + 1}.0", f"{b}.end").split("\n")
+        for i, line in enumerate(lines, a):
+            w, c = len(line.split()), len(line)
+            self.words += w - self.line_words[i]; self.line_words[i] = w
+            self.chars += c - self.line_chars[i]; self.line_chars[i] = c
+
+    def chars_total(self):
+        # Newlines between lines count as characters, the trailing one Tk keeps does not
+        return self.chars + len(self.line_chars) - 1
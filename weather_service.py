@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+
+
+# BACKGROUND WEATHER SERVICE
+# ------------------------------------------------------------------
+# Lookups run on a small thread pool over one pooled requests.Session.
+# Results land in a per-city TTL cache that is persisted between runs, and
+# concurrent lookups for the same city share a single in-flight request.
+# requests is imported on the first lookup, on a worker thread, so it never
+# costs the window anything at startup.
+
+OFFLINE = ("Offline", "Clear", "--")
+
+
+class WeatherService:
+    def __init__(self, api_key, cache_path="weather_cache.json", ttl=600,
+                 base_url="http://api.openweathermap.org/data/2.5/weather", max_workers=2):
+        self.api_key = api_key
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.base_url = base_url
+        self.max_workers = max_workers
+
+        self.session = None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather")
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        self._inflight = {}
+        self._cache = self._load_cache()
+
+    # CACHE
+    # ------------------------------------------------------------------
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r") as f: return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        # Workers finishing together would otherwise interleave in the same temp file
+        with self._save_lock:
+            with self._lock: snapshot = dict(self._cache)
+            tmp = self.cache_path + ".tmp"
+            try:
+                with open(tmp, "w") as f: json.dump(snapshot, f)
+                os.replace(tmp, self.cache_path)
+            except OSError:
+                pass
+
+    def last_known(self, city):
+        """Most recent reading for a city regardless of age, or None"""
+        hit = self._cache.get(city.lower())
+        return tuple(hit["reading"]) if hit else None
+
+    def _fresh(self, city):
+        hit = self._cache.get(city.lower())
+        if hit and time.time() - hit["ts"] < self.ttl:
+            return tuple(hit["reading"])
+        return None
+
+    # LOOKUPS
+    # ------------------------------------------------------------------
+    def fetch(self, city):
+        """Returns a Future resolving to (temp, condition, humidity)"""
+        fresh = self._fresh(city)
+        if fresh:
+            done = Future(); done.set_result(fresh)
+            return done
+
+        key = city.lower()
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is None:
+                fut = self._inflight[key] = self.executor.submit(self._fetch, city)
+                fut.add_done_callback(lambda f, k=key: self._inflight.pop(k, None))
+        return fut
+
+    def _session(self):
+        # Own lock: importing requests takes 100 ms or more, and fetch() takes self._lock on the Tk thread
+        with self._session_lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self.session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                self.session.mount("http://", adapter)
+                self.session.mount("https://", adapter)
+            return self.session
+
+    def _fetch(self, city):
+        if self.api_key == "YOUR_OPENWEATHER_API_KEY":
+            return "22°C", "Clear", "45%"
+
+        session = self._session()
+        from requests import RequestException
+        params = {"q": city, "appid": self.api_key, "units": "metric"}
+        try:
+            data = session.get(self.base_url, params=params, timeout=5).json()
+        except (RequestException, ValueError):
+            return OFFLINE
+
+        if data.get("cod") != 200:
+            return "N/A", "Clear", "--"
+        reading = (f"{round(data['main']['temp'])}°C", data['weather'][0]['main'], f"{data['main']['humidity']}%")
+        with self._lock:
+            self._cache[city.lower()] = {"reading": reading, "ts": time.time()}
+        self._save_cache()
+        return reading
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.session: self.session.close()